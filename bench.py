@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import IO, Any
+
+from core.engines import ENGINES
+
+
+def run_benchmark(benchmark: str, engine: str) -> tuple[float, str]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "radon.py", "-s", benchmark, f"--engine={engine}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark {benchmark!r} failed with the {engine} engine:\n{proc.stdout.decode('utf-8')}")
+    return elapsed, proc.stdout.decode("utf-8")
+
+
+def count_allocations(benchmark: str, engine: str) -> None:
+    """Run a benchmark in this process and print the number of objects of each runtime class it created"""
+    import core as base_core
+    from core.datatypes import Value
+    from core.errors import Error
+    from core.parser import Context, SymbolTable
+    from core.tokens import Position
+
+    counts: Counter[str] = Counter()
+
+    def counting_new(name: str) -> Any:
+        def new(cls: type, *args: Any, **kwargs: Any) -> Any:
+            counts[name] += 1
+            return object.__new__(cls)
+
+        return staticmethod(new)
+
+    for name, cls in [
+        ("values", Value),
+        ("contexts", Context),
+        ("symbol tables", SymbolTable),
+        ("positions", Position),
+    ]:
+        cls.__new__ = counting_new(name)  # type: ignore
+
+    with open(benchmark, "r") as f:
+        source = f.read()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        _, error, _ = base_core.run(benchmark, source, engine=engine)
+    if isinstance(error, Error):
+        raise RuntimeError(f"benchmark {benchmark!r} failed with the {engine} engine:\n{error.as_string()}")
+    print(json.dumps(counts))
+
+
+def measure_memory(benchmark: str, engine: str) -> None:
+    """Run a benchmark in this process and print the peak memory allocated while running it, in bytes"""
+    import core as base_core
+    from core.errors import Error
+
+    with open(benchmark, "r") as f:
+        source = f.read()
+    tracemalloc.start()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        _, error, _ = base_core.run(benchmark, source, engine=engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if isinstance(error, Error):
+        raise RuntimeError(f"benchmark {benchmark!r} failed with the {engine} engine:\n{error.as_string()}")
+    print(peak)
+
+
+def run_in_subprocess(function: str, benchmark: str, engine: str) -> str:
+    proc = subprocess.run(
+        [sys.executable, "-c", f"import sys, bench; bench.{function}(sys.argv[1], sys.argv[2])", benchmark, engine],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"benchmark {benchmark!r} failed with the {engine} engine:\n{proc.stderr.decode('utf-8')}")
+    return proc.stdout.decode("utf-8")
+
+
+def run_allocation_benchmark(benchmark: str, engine: str) -> dict[str, int]:
+    counts: dict[str, int] = json.loads(run_in_subprocess("count_allocations", benchmark, engine))
+    return counts
+
+
+def collect_benchmarks(path: str) -> list[str]:
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".rn"))
+    return [path]
+
+
+def run_benchmarks(path: str, engines: list[str], repeat: int) -> int:
+    print(f"{'benchmark':<32}" + "".join(f"{engine:>12}" for engine in engines))
+    for benchmark in collect_benchmarks(path):
+        timings: list[float] = []
+        outputs: set[str] = set()
+        for engine in engines:
+            best = float("inf")
+            for _ in range(repeat):
+                elapsed, output = run_benchmark(benchmark, engine)
+                best = min(best, elapsed)
+                outputs.add(output)
+            timings.append(best)
+
+        print(f"{benchmark:<32}" + "".join(f"{timing:>11.3f}s" for timing in timings))
+        if len(outputs) != 1:
+            print(f"ERROR: engines disagree on the output of {benchmark!r}", file=sys.stderr)
+            return 1
+    return 0
+
+
+ALLOCATED_OBJECTS = ["values", "contexts", "symbol tables", "positions"]
+
+
+def run_allocation_benchmarks(path: str, engines: list[str]) -> int:
+    print(f"{'benchmark':<32}{'engine':>8}" + "".join(f"{name:>15}" for name in ALLOCATED_OBJECTS))
+    for benchmark in collect_benchmarks(path):
+        for engine in engines:
+            counts = run_allocation_benchmark(benchmark, engine)
+            print(f"{benchmark:<32}{engine:>8}" + "".join(f"{counts.get(name, 0):>15}" for name in ALLOCATED_OBJECTS))
+    return 0
+
+
+def run_memory_benchmarks(path: str, engines: list[str]) -> int:
+    print(f"{'benchmark':<32}" + "".join(f"{engine:>12}" for engine in engines))
+    for benchmark in collect_benchmarks(path):
+        peaks = [int(run_in_subprocess("measure_memory", benchmark, engine)) for engine in engines]
+        print(f"{benchmark:<32}" + "".join(f"{peak / 1024 / 1024:>10.1f}MB" for peak in peaks))
+    return 0
+
+
+def usage(program_name: str, stream: IO[str]) -> None:
+    print(
+        f"""Usage: {program_name} [benchmarks] [--engine name] [--repeat n] [--allocations] [--memory]
+Run the benchmarks in [benchmarks] (default: "benchmarks/") with every engine and print the best wall time of each
+    --engine name - Only run the benchmarks with the given engine (can be repeated)
+    --repeat n    - Number of runs per benchmark and engine (default: 3)
+    --allocations - Print the number of values, contexts, symbol tables and positions created instead of timings
+    --memory      - Print the peak memory allocated by each benchmark instead of timings
+""",
+        file=stream,
+    )
+
+
+def main(argv: list[str]) -> int:
+    program_name = argv.pop(0)
+    path = "benchmarks"
+    engines: list[str] = []
+    repeat = 3
+    allocations = False
+    memory = False
+    while len(argv) > 0:
+        arg = argv.pop(0)
+        match arg:
+            case "--help" | "-h":
+                usage(program_name, sys.stdout)
+                return 0
+            case "--engine" | "--repeat" if len(argv) == 0:
+                usage(program_name, sys.stderr)
+                print(f"ERROR: {arg} requires an argument", file=sys.stderr)
+                return 1
+            case "--engine":
+                engine = argv.pop(0)
+                if engine not in ENGINES:
+                    print(f"ERROR: unknown engine '{engine}'", file=sys.stderr)
+                    return 1
+                engines.append(engine)
+            case "--repeat":
+                repeat = int(argv.pop(0))
+            case "--allocations":
+                allocations = True
+            case "--memory":
+                memory = True
+            case _:
+                path = arg
+
+    if allocations:
+        return run_allocation_benchmarks(path, engines or ENGINES)
+    if memory:
+        return run_memory_benchmarks(path, engines or ENGINES)
+    return run_benchmarks(path, engines or ENGINES, repeat)
+
+
+if __name__ == "__main__":
+    exit(main(sys.argv[:]))
@@ -40,7 +40,7 @@ class BuiltinsObject(BuiltInObject):
 
         try:
             global_symbol_table.set(str(name), obj)
-            return res.success(Boolean(True))
+            return res.success(Boolean.true())
         except Exception as e:
             return res.failure(RTError(name.pos_start, obj.pos_end, f"Error settting builtins: {str(e)}", ctx))
 
@@ -58,6 +58,6 @@ class BuiltinsObject(BuiltInObject):
 
         global_symbol_table.remove(str(name))
         try:
-            return res.success(Boolean(True))
+            return res.success(Boolean.true())
         except Exception as e:
             return res.failure(RTError(name.pos_start, name.pos_end, f"Error removing builtins: {str(e)}", ctx))
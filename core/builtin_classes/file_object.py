@@ -113,4 +113,4 @@ class FileObject(BuiltInObject):
         security.security_prompt("disk_access")
 
         res = RTResult[Value]()
-        return res.success(Boolean(self.file.closed))
+        return res.success(Boolean.of(self.file.closed))
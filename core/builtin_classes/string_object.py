@@ -112,7 +112,7 @@ class StringObject(BuiltInObject):
             return res.failure(
                 RTError(string.pos_start, string.pos_end, "Cannot startswith a non-string", string.context)
             )
-        return res.success(Boolean(self.value.startswith(string.value)))
+        return res.success(Boolean.of(self.value.startswith(string.value)))
 
     @args(["string"], [String("")])
     @method
@@ -124,7 +124,7 @@ class StringObject(BuiltInObject):
             return res.failure(
                 RTError(string.pos_start, string.pos_end, "Cannot endswith a non-string", string.context)
             )
-        return res.success(Boolean(self.value.endswith(string.value)))
+        return res.success(Boolean.of(self.value.endswith(string.value)))
 
     @args(["string"], [String(" ")])
     @method
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import os
+from collections import OrderedDict
 from sys import stdout
-from typing import Callable, Generic, NoReturn, Optional, ParamSpec, Protocol, Sequence, Union, cast
+from typing import Callable, Generic, Hashable, NoReturn, Optional, ParamSpec, Protocol, Sequence, Union, cast
 
-from core import security
+from core import engines, limits, security
 from core.datatypes import (
     Array,
     BaseFunction,
@@ -12,17 +13,22 @@ from core.datatypes import (
     Class,
     Function,
     HashMap,
+    Instance,
     Module,
     Null,
     Number,
     PyAPI,
     String,
+    UNSET_POSITION,
     Type,
     Value,
+    located_error,
 )
 from core.errors import Error, InvalidSyntaxError, RNModuleNotFoundError, RTError
 from core.lexer import Lexer
+from core.optimizer import optimize
 from core.parser import Context, Parser, RTResult, SymbolTable
+from core.resolver import resolve
 from core.tokens import BASE_DIR, STDLIBS, Position
 
 P = ParamSpec("P")
@@ -53,23 +59,94 @@ def args(
     return _args
 
 
+def memo_key(value: Value) -> Optional[Hashable]:
+    """The key of an argument in the cache of a `MemoizedFunction`, None if it is mutable"""
+    if isinstance(value, Null):
+        return Null
+    if isinstance(value, Number):
+        # `1` and `1.0` are equal, but aren't printed the same
+        return (Number, type(value.value), value.value)
+    if isinstance(value, String | Boolean):
+        return (type(value), value.value)
+    return None
+
+
+class MemoizedFunction(BaseFunction):
+    """A function caching its results, created by `memoize`
+
+    Results are cached for the arguments that are numbers, strings, booleans or null, keyed on their types and values.
+    The `maxsize` most recently used results are kept (all of them if `maxsize` is None). Calls with other arguments
+    (arrays, hashmaps, instances, ...), which could be mutated between calls, bypass the cache.
+    """
+
+    function: BaseFunction
+    maxsize: Optional[int]
+    cache: OrderedDict[Hashable, Value]
+    hits: int
+    misses: int
+
+    def __init__(self, function: BaseFunction, maxsize: Optional[int]) -> None:
+        super().__init__(function.name, None)
+        self.function = function
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.va_name = None
+
+    def execute(self, args: list[Value], kwargs: dict[str, Value]) -> RTResult[Value]:
+        return self.call(args, kwargs, self.pos_start, self.pos_end, self.context)
+
+    def call(
+        self, args: list[Value], kwargs: dict[str, Value], pos_start: Position, pos_end: Position, context: Context
+    ) -> RTResult[Value]:
+        res = RTResult[Value]()
+
+        arg_keys = [memo_key(arg) for arg in args]
+        kwarg_keys = [(kw, memo_key(kwarg)) for kw, kwarg in sorted(kwargs.items())]
+        key: Optional[Hashable] = None
+        if None not in arg_keys and all(kwarg_key is not None for _, kwarg_key in kwarg_keys):
+            key = (tuple(arg_keys), tuple(kwarg_keys))
+            value = self.cache.get(key)
+            if value is not None:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                return res.success(value)
+
+        self.misses += 1
+        value = res.register(self.function.call(args, kwargs, pos_start, pos_end, context))
+        if res.should_return():
+            return res
+        assert value is not None
+
+        if key is not None and self.maxsize != 0:
+            self.cache[key] = value
+            if self.maxsize is not None and len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return res.success(value)
+
+    def copy(self) -> MemoizedFunction:
+        return self
+
+    def __repr__(self) -> str:
+        return f"<memoized function {self.name}>"
+
+
 class BuiltInFunction(BaseFunction):
     def __init__(self, name: str, func: Optional[RadonCompatibleFunction[P]] = None):
         super().__init__(name, None)
         self.func = func
         self.va_name = None
 
+    def call(
+        self, args: list[Value], kwargs: dict[str, Value], pos_start: Position, pos_end: Position, context: Context
+    ) -> RTResult[Value]:
+        # Built-in functions report their errors at their own position: the call runs on a copy placed at the call site
+        located = BuiltInFunction(self.name, self.func).set_pos(pos_start, pos_end).set_context(context)
+        return located.execute(args, kwargs)
+
     def execute(self, args: list[Value], kwargs: dict[str, Value]) -> RTResult[Value]:
         res = RTResult[Value]()
-        if len(kwargs) > 0:
-            return res.failure(
-                RTError(
-                    list(kwargs.values())[0].pos_start,
-                    list(kwargs.values())[-1].pos_end,
-                    "Keyword arguments are not yet supported for built-in functions.",
-                    list(kwargs.values())[0].context,
-                )
-            )
         exec_ctx = self.generate_new_context()
 
         if self.func is None:
@@ -87,6 +164,10 @@ class BuiltInFunction(BaseFunction):
             return res
 
         return_value = res.register(method(exec_ctx))  # type: ignore
+        if res.error is not None and res.error.pos_start is UNSET_POSITION:
+            # Errors placed at an argument that has no position of its own (like an interned literal) go to the call
+            res.error.pos_start = self.pos_start
+            res.error.pos_end = self.pos_end
         if res.should_return():
             return res
         assert return_value is not None
@@ -104,6 +185,54 @@ class BuiltInFunction(BaseFunction):
 
     #####################################
 
+    @args(["function", "maxsize"], [None, Number(128)])
+    def execute_memoize(self, exec_ctx: Context) -> RTResult[Value]:
+        function = exec_ctx.symbol_table.get("function")
+        maxsize = exec_ctx.symbol_table.get("maxsize")
+
+        if not isinstance(function, BaseFunction):
+            return RTResult[Value]().failure(
+                RTError(self.pos_start, self.pos_end, "First argument must be function", exec_ctx)
+            )
+
+        if isinstance(maxsize, Null):
+            return RTResult[Value]().success(MemoizedFunction(function, None))
+        if not isinstance(maxsize, Number) or not isinstance(maxsize.value, int) or maxsize.value < 0:
+            return RTResult[Value]().failure(
+                RTError(self.pos_start, self.pos_end, "Second argument must be non-negative integer or null", exec_ctx)
+            )
+        return RTResult[Value]().success(MemoizedFunction(function, maxsize.value))
+
+    @args(["function"])
+    def execute_cache_info(self, exec_ctx: Context) -> RTResult[Value]:
+        function = exec_ctx.symbol_table.get("function")
+
+        if not isinstance(function, MemoizedFunction):
+            return RTResult[Value]().failure(
+                RTError(self.pos_start, self.pos_end, "First argument must be memoized function", exec_ctx)
+            )
+
+        info: dict[Hashable, Value] = {
+            "hits": Number(function.hits),
+            "misses": Number(function.misses),
+            "maxsize": Number(function.maxsize) if function.maxsize is not None else Null.null(),
+            "size": Number(len(function.cache)),
+        }
+        return RTResult[Value]().success(HashMap(info))
+
+    @args(["function"])
+    def execute_cache_clear(self, exec_ctx: Context) -> RTResult[Value]:
+        function = exec_ctx.symbol_table.get("function")
+
+        if not isinstance(function, MemoizedFunction):
+            return RTResult[Value]().failure(
+                RTError(self.pos_start, self.pos_end, "First argument must be memoized function", exec_ctx)
+            )
+
+        function.cache.clear()
+        function.hits = function.misses = 0
+        return RTResult[Value]().success(Null.null())
+
     @args(["value"])
     def execute_print(self, exec_ctx: Context) -> RTResult[Value]:
         value = exec_ctx.symbol_table.get("value")
@@ -150,6 +279,16 @@ class BuiltInFunction(BaseFunction):
                     )
                 )
 
+    @args(["value"])
+    def execute_hash(self, exec_ctx: Context) -> RTResult[Value]:
+        value = exec_ctx.symbol_table.get("value")
+        assert value is not None
+
+        key, error = value.hash_key()
+        if error is not None:
+            return RTResult[Value]().failure(located_error(error, (value,), self.pos_start, self.pos_end, exec_ctx))
+        return RTResult[Value]().success(Number(hash(key)))
+
     @args(["value"])
     def execute_input(self, exec_ctx: Context) -> RTResult[Value]:
         text = input(str(exec_ctx.symbol_table.get("value")))
@@ -489,8 +628,12 @@ class BuiltInFunction(BaseFunction):
         f: Function | Class | Value
         k: str
 
-        for k in obj.symbol_table.symbols.keys():
-            f = obj.symbol_table.symbols[k]
+        symbols = obj.symbol_table.symbols
+        if isinstance(obj, Instance):
+            # The methods of instances are in their class
+            symbols = obj.members()
+        for k in symbols.keys():
+            f = symbols[k]
             # print(k, f)
             # print(type(k), type(f))
             if isinstance(f, Function):
@@ -583,9 +726,9 @@ class BuiltInFunction(BaseFunction):
         value = ctx.symbol_table.get("value")
 
         if isinstance(value, Null):
-            return RTResult[Value]().success(Boolean(True))
+            return RTResult[Value]().success(Boolean.true())
         else:
-            return RTResult[Value]().success(Boolean(False))
+            return RTResult[Value]().success(Boolean.false())
 
     # Shell functions
     @args([])
@@ -639,13 +782,16 @@ def run(
     return_result: bool = False,
     hide_paths: bool = False,
     import_cwd: Optional[str] = None,
+    engine: Optional[str] = None,
 ) -> Union[
     tuple[None, Error, bool],
     tuple[None, InvalidSyntaxError, bool],
     tuple[None, RTResult[Value], None],
     tuple[Optional[Value], Optional[RTError | Error], bool],
 ]:
-    from core.interpreter import Interpreter  # Lazy import
+    # Select the engine for this program and every function it calls
+    if engine is not None:
+        engines.set_engine(engine)
 
     # Generate tokens
     fn = "[REDACTED]" if hide_paths else fn
@@ -662,8 +808,13 @@ def run(
         return None, ast.error, False
     assert ast.node is not None
 
+    # Optimize the program, then resolve variables to the scopes declaring them
+    ast.node = optimize(ast.node)
+    resolve(ast.node)
+
     # Run program
-    interpreter = Interpreter()
+    limits.fit_recursion_limit()
+    interpreter = engines.get_interpreter()
     # context = Context('<program>')
     # context.symbol_table = global_symbol_table
     context = Context("<program>", context, entry_pos, import_cwd=import_cwd)
@@ -671,7 +822,14 @@ def run(
         context.symbol_table = global_symbol_table
     else:
         context.symbol_table = context.parent.symbol_table
-    result = interpreter.visit(ast.node, context)
+    try:
+        result = interpreter.visit(ast.node, context)
+    except Exception as e:
+        if context.parent is None:
+            from core.interpreter import add_visit_notes  # Lazy import
+
+            add_visit_notes(e)
+        raise
 
     if return_result:
         return result  # type: ignore
@@ -695,6 +853,10 @@ def create_global_symbol_table() -> SymbolTable:
     ret.set("require", BuiltInFunction("require"))
     ret.set("exit", BuiltInFunction("exit"))
     ret.set("len", BuiltInFunction("len"))
+    ret.set("hash", BuiltInFunction("hash"))
+    ret.set("memoize", BuiltInFunction("memoize"))
+    ret.set("cache_info", BuiltInFunction("cache_info"))
+    ret.set("cache_clear", BuiltInFunction("cache_clear"))
     # Datatype validator methods
     ret.set("is_num", BuiltInFunction("is_num"))
     ret.set("is_int", BuiltInFunction("is_int"))
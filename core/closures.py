@@ -0,0 +1,793 @@
+"""Closure-compiling execution engine
+
+Instead of walking the AST and re-dispatching on the type of every node like `Interpreter` does, this engine
+compiles the AST once into a tree of Python closures. Each closure is specialized for the node it was compiled
+from: the operator of a `BinOpNode`, the variable name of a `VarAccessNode`, the argument nodes of a `CallNode`
+and so on are looked up once at compile time instead of on every evaluation.
+
+Nodes that are rarely executed in hot code (imports, classes, `try`, `switch`, ...) are not specialized, they
+are run by the regular `Interpreter.visit_*` methods and have their children compiled on first use.
+
+Closures return their value directly instead of wrapping it into an `RTResult`: non-local control flow (errors,
+`return`, `break`, `continue` and `exit`) raises a `Signal` carrying the result instead, so the common path never
+allocates results nor checks `should_return()` after every evaluation. Signals are caught by the loops (`break`
+and `continue`) and by `ClosureInterpreter.visit`, which hands the result back to the code calling it (`Function`
+checking `func_return_value`, `run` reporting the error, ...).
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Callable, Optional, TypeAlias, TypeVar
+
+from core.datatypes import (
+    DEFAULT_CONSTRUCTOR_BODY,
+    Array,
+    AttributeCache,
+    BaseClass,
+    BaseFunction,
+    BaseInstance,
+    Function,
+    Module,
+    Null,
+    Number,
+    ResultTuple,
+    Value,
+    located_error,
+)
+from core.errors import Error, RNNameError, RTError
+from core.interpreter import Interpreter, binary_operation
+from core.nodes import (
+    ArrayNode,
+    AttrAccessNode,
+    BinOpNode,
+    BlockNode,
+    BreakNode,
+    CallNode,
+    ConstantNode,
+    ContinueNode,
+    DecNode,
+    FalloutNode,
+    FallthroughNode,
+    ForInNode,
+    ForNode,
+    FuncDefNode,
+    IfNode,
+    IncNode,
+    IndexGetNode,
+    IndexSetNode,
+    Node,
+    NullNode,
+    NumberNode,
+    ReturnNode,
+    StringNode,
+    SwitchNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    WhileNode,
+)
+from core.parser import Context, RTResult, SymbolTable
+from core.tokens import TT_KEYWORD, TT_MINUS, Position
+
+Closure: TypeAlias = Callable[[Context], Value]
+
+T = TypeVar("T")
+
+
+class Signal(Exception):
+    """Non-local control flow unwinding the closures, carrying the result that `should_return()`"""
+
+    result: RTResult[Any]
+
+    def __init__(self, result: RTResult[Any]) -> None:
+        self.result = result
+
+
+class ErrorSignal(Signal):
+    pass
+
+
+class ReturnSignal(Signal):
+    pass
+
+
+class BreakSignal(Signal):
+    pass
+
+
+class ContinueSignal(Signal):
+    pass
+
+
+class ExitSignal(Signal):
+    pass
+
+
+def signal(result: RTResult[Any]) -> Signal:
+    """The signal raised for a result that `should_return()`"""
+    if result.error is not None:
+        return ErrorSignal(result)
+    if result.func_return_value is not None or result.tail_call is not None:
+        return ReturnSignal(result)
+    if result.loop_should_break:
+        return BreakSignal(result)
+    if result.loop_should_continue:
+        return ContinueSignal(result)
+    return ExitSignal(result)
+
+
+def failure(error: Error) -> Signal:
+    res: RTResult[Value] = RTResult()
+    return ErrorSignal(res.failure(error))
+
+
+def value_of(result: RTResult[T]) -> T:
+    """The value of a result returned by the regular visitor methods, raising its signal if it has none"""
+    if result.should_return():
+        raise signal(result)
+    assert result.value is not None
+    return result.value
+
+
+def result_of(closure: Closure, context: Context) -> RTResult[Value]:
+    """Run a closure, turning the value or the signal back into a result for the regular visitor methods"""
+    res: RTResult[Value] = RTResult()
+    try:
+        value = closure(context)
+    except Signal as e:
+        return e.result
+    return res.success(value)
+
+
+def block_context(context: Context, pos_start: Position, scoped: bool) -> Context:
+    """Same scope as the one created by `Interpreter.visit_block`"""
+    if not scoped:
+        return context
+    return Context("<block scope>", context, pos_start, SymbolTable(context.symbol_table))
+
+
+class CompiledNode:
+    """A node whose evaluation has been compiled into a closure, used as the body of compiled functions
+
+    The other engines run the original `node` (see `Interpreter.visit_CompiledNode`)."""
+
+    node: Node
+    closure: Closure
+
+    pos_start: Position
+    pos_end: Position
+
+    def __init__(self, node: Node, closure: Closure) -> None:
+        self.node = node
+        self.closure = closure
+
+        self.pos_start = node.pos_start
+        self.pos_end = node.pos_end
+
+
+class ClosureInterpreter(Interpreter):
+    """Interpreter running compiled closures instead of walking the AST"""
+
+    def visit(self, node: Node, context: Context) -> RTResult[Value]:
+        if isinstance(node, CompiledNode):
+            closure = node.closure
+        elif node is DEFAULT_CONSTRUCTOR_BODY:
+            closure = default_constructor_closure
+        else:
+            # Programs are run once, only the bodies of functions created by another engine are compiled again
+            closure = compiler.compile(node)
+        res: RTResult[Value] = RTResult()
+        try:
+            value = closure(context)
+        except Signal as e:
+            return e.result
+        except Exception as e:
+            if sys.version_info >= (3, 11):
+                e.add_note(f"{node.pos_start} - {node.pos_end}: NOTE: happened here")
+            raise
+        return res.success(value)
+
+
+class LazyInterpreter(Interpreter):
+    """Runs a node with the regular visitor methods, compiling the children it visits on first use"""
+
+    closures: dict[int, Closure]
+
+    def __init__(self, compiler: ClosureCompiler) -> None:
+        self.compiler = compiler
+        self.closures = {}
+
+    def visit(self, node: Node, context: Context) -> RTResult[Value]:
+        # The compiled closure of the parent node keeps the whole subtree alive, so ids can't be reused
+        closure = self.closures.get(id(node))
+        if closure is None:
+            closure = self.closures[id(node)] = self.compiler.compile(node)
+        return result_of(closure, context)
+
+
+class SwitchInterpreter(LazyInterpreter):
+    """Runs a `switch` like `LazyInterpreter`, walking the blocks and `if`s of its cases
+
+    `fallthrough` and `fallout` are flags on the result of the last statement of a case, which closures don't return.
+    """
+
+    def visit(self, node: Node, context: Context) -> RTResult[Value]:
+        if isinstance(node, BlockNode | IfNode | FallthroughNode | FalloutNode):
+            return Interpreter.visit(self, node, context)
+        return super().visit(node, context)
+
+
+class ClosureCompiler:
+    interpreter: Interpreter
+
+    def __init__(self) -> None:
+        # Only used for the helpers shared with the visitor (`assign`)
+        self.interpreter = Interpreter()
+
+    def compile(self, node: Node) -> Closure:
+        method: Optional[Callable[[Node], Closure]] = getattr(self, f"compile_{type(node).__name__}", None)
+        if method is None:
+            return self.compile_fallback(node)
+        return method(node)
+
+    def compile_fallback(self, node: Node, interpreter_class: type[LazyInterpreter] = LazyInterpreter) -> Closure:
+        interpreter = interpreter_class(self)
+        method: Callable[[Node, Context], RTResult[Value]] = getattr(
+            interpreter, f"visit_{type(node).__name__}", interpreter.no_visit_method
+        )
+
+        def fallback(context: Context) -> Value:
+            return value_of(method(node, context))
+
+        return fallback
+
+    ###################################
+
+    def compile_NullNode(self, node: NullNode) -> Closure:
+        def null(context: Context) -> Value:
+            return Null.null()
+
+        return null
+
+    def compile_NumberNode(self, node: NumberNode) -> Closure:
+        return self.compile_value(node.value)
+
+    def compile_StringNode(self, node: StringNode) -> Closure:
+        return self.compile_value(node.value)
+
+    def compile_ArrayNode(self, node: ArrayNode) -> Closure:
+        element_closures = [self.compile(element_node) for element_node in node.element_nodes]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def array(context: Context) -> Value:
+            elements = [element_closure(context) for element_closure in element_closures]
+            return Array(elements).set_context(context).set_pos(pos_start, pos_end)
+
+        return array
+
+    def compile_ConstantNode(self, node: ConstantNode) -> Closure:
+        return self.compile_value(node.value)
+
+    def compile_value(self, value: Value) -> Closure:
+        """A closure evaluating to a value known at compile time (literals and constants)"""
+
+        def constant(context: Context) -> Value:
+            return value
+
+        return constant
+
+    def compile_BlockNode(self, node: BlockNode) -> Closure:
+        statement_closures = [self.compile(statement) for statement in node.statements]
+
+        if len(statement_closures) == 0:
+            return self.compile_NullNode(NullNode(node.pos_start, node.pos_end))
+        *init_closures, last_closure = statement_closures
+
+        def block(context: Context) -> Value:
+            for statement_closure in init_closures:
+                statement_closure(context)
+            return last_closure(context)
+
+        return block
+
+    def compile_VarAccessNode(self, node: VarAccessNode) -> Closure:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "This could be a bug in the lexer"
+        depth = node.depth
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def var_access(context: Context) -> Value:
+            value = context.symbol_table.lookup(var_name, depth)
+            if value is None:
+                raise failure(RNNameError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+            return value
+
+        return var_access
+
+    def compile_VarAssignNode(self, node: VarAssignNode) -> Closure:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str)
+        value_closure = self.compile(node.value_node)
+        extra_names = node.extra_names
+        qualifier = node.qualifier
+        depth = node.depth
+        pos_start, pos_end = node.pos_start, node.pos_end
+        interpreter = self.interpreter
+
+        if extra_names == []:
+            qualifier_str = None if qualifier is None else qualifier.value
+            assert qualifier_str is None or isinstance(qualifier_str, str)
+
+            def var_assign(context: Context) -> Value:
+                value = value_closure(context)
+                error = context.symbol_table.set_var(var_name, value, qualifier_str, depth).error
+                if error is not None:
+                    raise failure(located_error(error, (value,), pos_start, pos_end, context))
+                return value
+
+            return var_assign
+
+        def attr_assign(context: Context) -> Value:
+            return value_of(
+                interpreter.assign(
+                    var_name=var_name,
+                    value=value_closure(context),
+                    context=context,
+                    extra_names=extra_names,
+                    qualifier=qualifier,
+                    pos_start=pos_start,
+                    pos_end=pos_end,
+                )
+            )
+
+        return attr_assign
+
+    def compile_BinOpNode(self, node: BinOpNode) -> Closure:
+        left_closure = self.compile(node.left_node)
+        right_closure = self.compile(node.right_node)
+        operation, number_operation, short_circuit = binary_operation(node.op_tok)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def bin_op(context: Context) -> Value:
+            left = left_closure(context)
+            right = right_closure(context)
+
+            result, error = operation(left, right)
+            if error:
+                raise failure(located_error(error, (left, right), pos_start, pos_end, context))
+            assert result is not None
+            return result
+
+        if short_circuit is not None:
+
+            def logical_op(context: Context) -> Value:
+                left = left_closure(context)
+                decided = short_circuit(left)
+                if decided is not None:
+                    return decided
+
+                right = right_closure(context)
+                result, error = operation(left, right)
+                if error:
+                    raise failure(located_error(error, (left, right), pos_start, pos_end, context))
+                assert result is not None
+                return result
+
+            return logical_op
+
+        if number_operation is None:
+            return bin_op
+        function, result_type = number_operation
+
+        def number_bin_op(context: Context) -> Value:
+            left = left_closure(context)
+            right = right_closure(context)
+
+            if type(left) is Number and type(right) is Number:
+                try:
+                    value = function(left.value, right.value)
+                except ZeroDivisionError:
+                    pass
+                else:
+                    return result_type.of(value)
+
+            result, error = operation(left, right)
+            if error:
+                raise failure(located_error(error, (left, right), pos_start, pos_end, context))
+            assert result is not None
+            return result
+
+        return number_bin_op
+
+    def compile_UnaryOpNode(self, node: UnaryOpNode) -> Closure:
+        operand_closure = self.compile(node.node)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        operation: Callable[[Value], ResultTuple]
+        if node.op_tok.type == TT_MINUS:
+            operation = lambda operand: operand.multed_by(Number(-1))  # noqa: E731
+        elif node.op_tok.matches(TT_KEYWORD, "not"):
+            operation = lambda operand: operand.notted()  # noqa: E731
+        else:
+            assert False, f"invalid unary operation: {node.op_tok}, this is probably a bug in the parser."
+
+        def unary_op(context: Context) -> Value:
+            operand = operand_closure(context)
+            result, error = operation(operand)
+            if error:
+                raise failure(located_error(error, (operand,), pos_start, pos_end, context))
+            assert result is not None
+            return result
+
+        return unary_op
+
+    def compile_IfNode(self, node: IfNode) -> Closure:
+        cases = [
+            (self.compile(condition), self.compile(expr), expr.pos_start, scoped, should_return_null)
+            for (condition, expr, should_return_null), scoped in zip(node.cases, node.case_scopes)
+        ]
+        else_case = None
+        if node.else_case is not None:
+            expr, should_return_null = node.else_case
+            else_case = (self.compile(expr), expr.pos_start, node.else_scope, should_return_null)
+
+        def if_(context: Context) -> Value:
+            for condition_closure, expr_closure, expr_pos_start, scoped, should_return_null in cases:
+                if condition_closure(context).is_true():
+                    value = expr_closure(block_context(context, expr_pos_start, scoped))
+                    return Null.null() if should_return_null else value
+
+            if else_case is not None:
+                expr_closure, expr_pos_start, scoped, should_return_null = else_case
+                value = expr_closure(block_context(context, expr_pos_start, scoped))
+                return Null.null() if should_return_null else value
+
+            return Null.null()
+
+        return if_
+
+    def compile_ForNode(self, node: ForNode) -> Closure:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "this could be a bug in the parser"
+        start_closure = self.compile(node.start_value_node)
+        end_closure = self.compile(node.end_value_node)
+        step_closure = self.compile(node.step_value_node) if node.step_value_node is not None else None
+        body_closure = self.compile(node.body_node)
+        body_pos_start = node.body_node.pos_start
+        body_scope = node.body_scope
+        should_return_null = node.should_return_null
+        start_pos = node.start_value_node.pos_start, node.start_value_node.pos_end
+        end_pos = node.end_value_node.pos_start, node.end_value_node.pos_end
+        step_pos = (
+            (node.step_value_node.pos_start, node.step_value_node.pos_end) if node.step_value_node is not None else None
+        )
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def for_(context: Context) -> Value:
+            # The values of the body are only collected when the loop is used as an expression
+            elements: Optional[list[Value]] = None if should_return_null else []
+
+            start_value = start_closure(context)
+            if not isinstance(start_value, Number):
+                raise failure(RTError(*start_pos, "Start value must be a number", context))
+
+            end_value = end_closure(context)
+            if not isinstance(end_value, Number):
+                raise failure(RTError(*end_pos, "End value must be a number", context))
+
+            if step_closure is not None:
+                assert step_pos is not None
+                step_value = step_closure(context)
+                if not isinstance(step_value, Number):
+                    raise failure(RTError(*step_pos, "Step value must be a number", context))
+            else:
+                step_value = Number(1)
+
+            i = start_value.value
+            end = end_value.value
+            step = step_value.value
+            ascending = step >= 0
+            symbol_table = context.symbol_table
+
+            while i < end if ascending else i > end:
+                symbol_table.set(var_name, Number(i))
+                i += step
+
+                try:
+                    value = body_closure(block_context(context, body_pos_start, body_scope))
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                if elements is not None:
+                    elements.append(value)
+
+            if elements is None:
+                return Null.null()
+            return Array(elements).set_context(context).set_pos(pos_start, pos_end)
+
+        return for_
+
+    def compile_WhileNode(self, node: WhileNode) -> Closure:
+        condition_closure = self.compile(node.condition_node)
+        body_closure = self.compile(node.body_node)
+        body_pos_start = node.body_node.pos_start
+        body_scope = node.body_scope
+        should_return_null = node.should_return_null
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def while_(context: Context) -> Value:
+            # The values of the body are only collected when the loop is used as an expression
+            elements: Optional[list[Value]] = None if should_return_null else []
+
+            while condition_closure(context).is_true():
+                try:
+                    value = body_closure(block_context(context, body_pos_start, body_scope))
+                except ContinueSignal:
+                    continue
+                except BreakSignal:
+                    break
+
+                if elements is not None:
+                    elements.append(value)
+
+            if elements is None:
+                return Null.null()
+            return Array(elements).set_context(context).set_pos(pos_start, pos_end)
+
+        return while_
+
+    def compile_ForInNode(self, node: ForInNode) -> Closure:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "This could be a bug in the lexer"
+        iterable_closure = self.compile(node.iterable_node)
+        body_closure = self.compile(node.body_node)
+        should_return_null = node.should_return_null
+        pos_start, pos_end = node.pos_start, node.pos_end
+        iterable_start, iterable_end = node.iterable_node.pos_start, node.iterable_node.pos_end
+
+        def for_in(context: Context) -> Value:
+            iterable = iterable_closure(context)
+            it = iterable.iter()
+
+            # The values of the body are only collected when the loop is used as an expression
+            elements: Optional[list[Value]] = None if should_return_null else []
+
+            for it_res in it:
+                if it_res.error is not None:
+                    raise failure(located_error(it_res.error, (iterable,), iterable_start, iterable_end, context))
+                context.symbol_table.set(var_name, value_of(it_res))
+
+                try:
+                    value = body_closure(context)
+                except BreakSignal:
+                    break
+                except ContinueSignal:
+                    continue
+
+                if elements is not None:
+                    elements.append(value)
+
+            if elements is None:
+                return Null.null()
+            return Array(elements).set_context(context).set_pos(pos_start, pos_end)
+
+        return for_in
+
+    def compile_FuncDefNode(self, node: FuncDefNode) -> Closure:
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        assert func_name is None or isinstance(func_name, str)
+        body_node = CompiledNode(node.body_node, self.compile(node.body_node))
+        arg_names = [str(arg_name.value) for arg_name in node.arg_name_toks]
+        default_closures = [self.compile(default) if default is not None else None for default in node.defaults]
+        should_auto_return = node.should_auto_return
+        func_desc = node.desc
+        va_name = node.va_name
+        max_pos_args = node.max_pos_args
+        static = node.static
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def func_def(context: Context) -> Value:
+            defaults: list[Optional[Value]] = [
+                default_closure(context) if default_closure is not None else None
+                for default_closure in default_closures
+            ]
+
+            func_value = (
+                Function(
+                    func_name,
+                    context.symbol_table,
+                    body_node,
+                    arg_names,
+                    defaults,
+                    should_auto_return,
+                    func_desc,
+                    va_name=va_name,
+                    max_pos_args=max_pos_args,
+                )
+                .set_context(context)
+                .set_pos(pos_start, pos_end)
+            )
+
+            if func_name is not None:
+                if static:
+                    context.symbol_table.set_static(func_name, func_value, "var")
+                else:
+                    context.symbol_table.set(func_name, func_value)
+
+            return func_value
+
+        return func_def
+
+    def compile_CallNode(self, node: CallNode, tail_call: bool = False) -> Closure:
+        callee_closure = self.compile(node.node_to_call)
+        arg_closures = [self.compile(arg_node) for arg_node in node.arg_nodes]
+        kwarg_closures = [(kw, self.compile(kwarg_node)) for kw, kwarg_node in node.kwarg_nodes.items()]
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def call(context: Context) -> Value:
+            value_to_call = callee_closure(context)
+            args = [arg_closure(context) for arg_closure in arg_closures]
+            kwargs = {kw: kwarg_closure(context) for kw, kwarg_closure in kwarg_closures}
+
+            return value_of(value_to_call.call(args, kwargs, pos_start, pos_end, context))
+
+        if not tail_call:
+            return call
+
+        def tail_call_(context: Context) -> Value:
+            value_to_call = callee_closure(context)
+            args = [arg_closure(context) for arg_closure in arg_closures]
+            kwargs = {kw: kwarg_closure(context) for kw, kwarg_closure in kwarg_closures}
+
+            res: RTResult[Value] = RTResult()
+            if isinstance(value_to_call, Function):
+                raise ReturnSignal(res.success_tail_call(value_to_call, args, kwargs, pos_start, pos_end, context))
+            return_value = value_of(value_to_call.call(args, kwargs, pos_start, pos_end, context))
+            raise ReturnSignal(res.success_return(return_value))
+
+        return tail_call_
+
+    def compile_ReturnNode(self, node: ReturnNode) -> Closure:
+        if node.tail_call:
+            assert isinstance(node.node_to_return, CallNode)
+            return self.compile_CallNode(node.node_to_return, tail_call=True)
+        value_closure = self.compile(node.node_to_return) if node.node_to_return is not None else None
+
+        def return_(context: Context) -> Value:
+            res: RTResult[Value] = RTResult()
+            value = value_closure(context) if value_closure is not None else Null.null()
+            raise ReturnSignal(res.success_return(value))
+
+        return return_
+
+    def compile_ContinueNode(self, node: ContinueNode) -> Closure:
+        def continue_(context: Context) -> Value:
+            res: RTResult[Value] = RTResult()
+            raise ContinueSignal(res.success_continue())
+
+        return continue_
+
+    def compile_BreakNode(self, node: BreakNode) -> Closure:
+        def break_(context: Context) -> Value:
+            res: RTResult[Value] = RTResult()
+            raise BreakSignal(res.success_break())
+
+        return break_
+
+    def compile_SwitchNode(self, node: SwitchNode) -> Closure:
+        return self.compile_fallback(node, SwitchInterpreter)
+
+    def compile_IndexGetNode(self, node: IndexGetNode) -> Closure:
+        indexee_closure = self.compile(node.indexee)
+        index_closure = self.compile(node.index)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def index_get(context: Context) -> Value:
+            indexee = indexee_closure(context)
+            index = index_closure(context)
+            result, error = indexee.get_index(index)
+            if error is not None:
+                raise failure(located_error(error, (indexee, index), pos_start, pos_end, context))
+            assert result is not None
+            return result
+
+        return index_get
+
+    def compile_IndexSetNode(self, node: IndexSetNode) -> Closure:
+        indexee_closure = self.compile(node.indexee)
+        index_closure = self.compile(node.index)
+        value_closure = self.compile(node.value)
+        pos_start, pos_end = node.pos_start, node.pos_end
+
+        def index_set(context: Context) -> Value:
+            indexee = indexee_closure(context)
+            index = index_closure(context)
+            value = value_closure(context)
+            result, error = indexee.set_index(index, value)
+            if error:
+                raise failure(located_error(error, (indexee, index, value), pos_start, pos_end, context))
+            assert result is not None
+            return result
+
+        return index_set
+
+    def compile_AttrAccessNode(self, node: AttrAccessNode) -> Closure:
+        object_closure = self.compile(node.node_to_access)
+        attr_name = node.attr_name_tok.value
+        assert isinstance(attr_name, str), "This could be a bug in the lexer"
+        pos_start, pos_end = node.pos_start, node.pos_end
+        cache = AttributeCache(attr_name)
+
+        def attr_access(context: Context) -> Value:
+            obj = object_closure(context)
+            if not isinstance(obj, (BaseClass, BaseInstance, Module)):
+                raise failure(
+                    RTError(
+                        pos_start,
+                        pos_end,
+                        "Dotted attribute access may only be used on classes, instances and modules for now",
+                        context,
+                    )
+                )
+
+            value = cache.get(obj)
+            if value is None:
+                raise failure(RTError(pos_start, pos_end, f"Attribute '{attr_name}' does not exist", context))
+
+            if isinstance(obj, BaseInstance) and isinstance(value, BaseFunction):
+                return value_of(obj.get_bound_method(attr_name, value))
+            return value
+
+        return attr_access
+
+    def compile_IncNode(self, node: IncNode) -> Closure:
+        return self.compile_step(node, lambda value: value.added_to(Number.one()))
+
+    def compile_DecNode(self, node: DecNode) -> Closure:
+        return self.compile_step(node, lambda value: value.subbed_by(Number.one()))
+
+    def compile_step(self, node: IncNode | DecNode, operation: Callable[[Value], ResultTuple]) -> Closure:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "This could be a bug in the lexer"
+        extra_names = node.extra_names
+        qualifier = node.qualifier
+        depth = node.depth
+        pre = node.is_pre
+        pos_start, pos_end = node.pos_start, node.pos_end
+        interpreter = self.interpreter
+
+        def step(context: Context) -> Value:
+            old_value = context.symbol_table.lookup(var_name, depth)
+            if old_value is None:
+                raise failure(RNNameError(pos_start, pos_end, f"'{var_name}' is not defined", context))
+
+            new_value, error = operation(old_value)
+            if error is not None:
+                raise failure(located_error(error, (old_value,), pos_start, pos_end, context))
+            assert new_value is not None
+
+            result = interpreter.assign(
+                var_name=var_name,
+                value=new_value,
+                context=context,
+                extra_names=extra_names,
+                qualifier=qualifier,
+                depth=depth,
+                pos_start=pos_start,
+                pos_end=pos_end,
+            )
+            if result.should_return():
+                raise signal(result)
+
+            return new_value if pre else old_value
+
+        return step
+
+
+compiler = ClosureCompiler()
+
+# Body shared by every default constructor
+default_constructor_closure = compiler.compile(DEFAULT_CONSTRUCTOR_BODY)
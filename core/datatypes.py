@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import inspect
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Generator
+from typing import TYPE_CHECKING, Any, Generator, Hashable
 from typing import Iterator as PyIterator
 from typing import Optional, TypeAlias, TypeVar
 
+from core import engines, limits
 from core.colortools import Log
-from core.errors import Error, RNIndexError, RNKeyError, RNNameError, RTError
+from core.errors import Error, RNIndexError, RNKeyError, RNNameError, RNRecursionError, RNTypeError, RTError
 from core.nodes import NullNode
 from core.parser import Context, RTResult, SymbolTable
 from core.tokens import STDLIBS, Position
@@ -19,6 +20,8 @@ if TYPE_CHECKING:
 
 # ResultTuple: TypeAlias = "tuple[None, Error] | tuple[Value, None]"
 ResultTuple: TypeAlias = tuple[Optional["Value"], Optional[Error]]
+# The key of a value in hash tables (see `Value.hash_key`)
+HashResult: TypeAlias = tuple[Optional[Hashable], Optional[Error]]
 
 
 ClassInstance: TypeAlias = Any
@@ -49,27 +52,43 @@ def generate_help_docs(obj: ClassInstance) -> str:
     return output
 
 
+# Location of the values that were not placed yet. They are shared by all these values and never mutated: placing a
+# value replaces them
+UNSET_POSITION = Position(0, 0, 0, "<unset>", "<unset>")
+UNSET_CONTEXT = Context("<unset>")
+
+# Body of the default constructors, shared so the engines compile it once
+DEFAULT_CONSTRUCTOR_BODY: Node = NullNode(None, None)  # type: ignore[assignment]
+
+
 class Value:
+    __slots__ = ("pos_start", "pos_end", "context")
+
     pos_start: Position
     pos_end: Position
     context: Context
 
     def __init__(self) -> None:
-        self.set_pos()
-        self.set_context()
+        self.pos_start = UNSET_POSITION
+        self.pos_end = UNSET_POSITION
+        self.context = UNSET_CONTEXT
 
     def set_pos(self: Self, pos_start: Optional[Position] = None, pos_end: Optional[Position] = None) -> Self:
-        self.pos_start = pos_start if pos_start is not None else Position(0, 0, 0, "<unset>", "<unset>")
-        self.pos_end = pos_end if pos_end is not None else Position(0, 0, 0, "<unset>", "<unset>")
+        self.pos_start = pos_start if pos_start is not None else UNSET_POSITION
+        self.pos_end = pos_end if pos_end is not None else UNSET_POSITION
         return self
 
     def set_context(self: Self, context: Optional[Context] = None) -> Self:
-        self.context = context if context is not None else Context("<unset>")
+        self.context = context if context is not None else UNSET_CONTEXT
         return self
 
     def added_to(self, other: Value) -> ResultTuple:
         return None, self.illegal_operation(other)
 
+    def added_in_place(self, other: Value) -> ResultTuple:
+        """The result of `+=`, which may reuse this value instead of creating a new one"""
+        return self.added_to(other)
+
     def subbed_by(self, other: Value) -> ResultTuple:
         return None, self.illegal_operation(other)
 
@@ -133,9 +152,27 @@ class Value:
     def execute(self, args: list[Value], kwargs: dict[str, Value]) -> RTResult[Value]:
         return RTResult[Value]().failure(self.illegal_operation())
 
+    def call(
+        self, args: list[Value], kwargs: dict[str, Value], pos_start: Position, pos_end: Position, context: Context
+    ) -> RTResult[Value]:
+        """Execute the value called from a call site of `context`
+
+        The value is shared by all its uses, so it isn't moved to the call site: the errors of the call are."""
+        res = self.execute(args, kwargs)
+        if res.error is not None:
+            located_error(res.error, (self,), pos_start, pos_end, context)
+        return res
+
     def contains(self, other: Value) -> ResultTuple:
         return None, self.illegal_operation(other)
 
+    def hash_key(self) -> HashResult:
+        """The key of the value in hash tables: the keys of equal values are equal and have the same hash
+
+        Mutable values have no key, they can't be looked up by hash.
+        """
+        return None, RNTypeError(self.pos_start, self.pos_end, f"Unhashable type '{type(self).__name__}'", self.context)
+
     def copy(self: Self) -> Self:
         raise Exception("No copy method defined")
 
@@ -166,6 +203,33 @@ class Value:
             return RTError(self.pos_start, self.pos_end, f"Illegal operation for {self}", self.context)
 
 
+def located_error(
+    error: Error, operands: tuple[Value, ...], pos_start: Position, pos_end: Position, context: Context
+) -> Error:
+    """Place an error returned by an operation on `operands` at the node that ran the operation.
+
+    Values are shared and don't know where they are used, so the errors made by the operations themselves (of any
+    type, all of them have the context of an operand) are moved to the node. Errors of the code the operation called,
+    like an operator method, are already placed and kept as they are."""
+    if any(error.context is operand.context for operand in operands):
+        error.pos_start = pos_start
+        error.pos_end = pos_end
+        error.context = context
+    return error
+
+
+def is_interned(value: Value) -> bool:
+    """Whether `value` is one of the interned values shared by the whole program (small integers, `true`, `false`,
+    `null` and the empty string), those are never placed or given a context"""
+    if isinstance(value, Number):
+        return (
+            type(value.value) is int
+            and SMALL_INT_MIN <= value.value <= SMALL_INT_MAX
+            and value is Number.of(value.value)
+        )
+    return value is TRUE or value is FALSE or value is NULL or value is EMPTY_STRING
+
+
 class Iterator(Value):
     """An Iterator is an object that enables traversal over a collection, one element at a time."""
 
@@ -203,12 +267,21 @@ An Iterator is an object that enables traversal over a collection, one element a
 
 
 class Number(Value):
+    __slots__ = ("value",)
+
     value: int | float
 
     def __init__(self, value: int | float) -> None:
         super().__init__()
         self.value = value
 
+    @classmethod
+    def of(cls, value: int | float) -> Number:
+        """A number with the given value, small integers are interned (the same instance is returned every time)"""
+        if type(value) is int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+            return SMALL_INTS[value - SMALL_INT_MIN]
+        return cls(value)
+
     def added_to(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
             return Number(self.value + other.value).set_context(self.context), None
@@ -260,41 +333,41 @@ class Number(Value):
 
     def get_comparison_eq(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            return Boolean(self.value == other.value).set_context(self.context), None
+            return Boolean.of(self.value == other.value), None
         elif isinstance(other, String):
-            return Boolean(False).set_context(self.context), None
+            return Boolean.false(), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_ne(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            return Boolean(self.value != other.value).set_context(self.context), None
+            return Boolean.of(self.value != other.value), None
         elif isinstance(other, String):
-            return Boolean(True).set_context(self.context), None
+            return Boolean.true(), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_lt(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            return Boolean(self.value < other.value).set_context(self.context), None
+            return Boolean.of(self.value < other.value), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_gt(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            return Boolean(self.value > other.value).set_context(self.context), None
+            return Boolean.of(self.value > other.value), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_lte(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            return Boolean(self.value <= other.value).set_context(self.context), None
+            return Boolean.of(self.value <= other.value), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_gte(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            return Boolean(self.value >= other.value).set_context(self.context), None
+            return Boolean.of(self.value >= other.value), None
         else:
             return None, Value.illegal_operation(self, other)
 
@@ -322,6 +395,9 @@ class Number(Value):
     def is_true(self) -> bool:
         return self.value != 0
 
+    def hash_key(self) -> HashResult:
+        return (Number, self.value), None
+
     def __str__(self) -> str:
         return str(self.value)
 
@@ -346,46 +422,60 @@ Example: 25
 
     @classmethod
     def one(cls) -> Number:
-        return cls(1)
+        return SMALL_INTS[1 - SMALL_INT_MIN]
+
+
+# Values are immutable, so the most common ones are interned: these instances are shared by every use and never
+# relocated (`set_pos`, `set_context`), errors are placed at the nodes using them (see `located_error`)
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+SMALL_INTS = [Number(value) for value in range(SMALL_INT_MIN, SMALL_INT_MAX + 1)]
 
 
 class Boolean(Value):
+    __slots__ = ("value",)
+
     value: bool
 
     def __init__(self, value: bool) -> None:
         super().__init__()
         self.value = value
 
+    @classmethod
+    def of(cls, value: bool) -> Boolean:
+        """The interned `true` or `false`"""
+        return TRUE if value else FALSE
+
     def anded_by(self, other: Value) -> ResultTuple:
-        return Boolean(self.value and other.is_true()).set_context(self.context), None
+        return Boolean.of(self.value and other.is_true()), None
 
     def ored_by(self, other: Value) -> ResultTuple:
-        return Boolean(self.value or other.is_true()).set_context(self.context), None
+        return Boolean.of(self.value or other.is_true()), None
 
     def notted(self) -> ResultTuple:
-        return Boolean(not self.value).set_context(self.context), None
+        return Boolean.of(not self.value), None
 
     def get_comparison_eq(self, other: Value) -> ResultTuple:
         if isinstance(other, Boolean):
-            return Boolean(self.value == other.value).set_context(self.context), None
+            return Boolean.of(self.value == other.value), None
         elif isinstance(other, Number):
-            return Boolean(self.value == other.value).set_context(self.context), None
+            return Boolean.of(self.value == other.value), None
         elif isinstance(other, String):
-            return Boolean(False).set_context(self.context), None
+            return Boolean.false(), None
         elif isinstance(other, Array):
-            return Boolean(False).set_context(self.context), None
+            return Boolean.false(), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_ne(self, other: Value) -> ResultTuple:
         if isinstance(other, Boolean):
-            return Boolean(self.value != other.value).set_context(self.context), None
+            return Boolean.of(self.value != other.value), None
         elif isinstance(other, Number):
-            return Boolean(self.value != other.value).set_context(self.context), None
+            return Boolean.of(self.value != other.value), None
         elif isinstance(other, String):
-            return Boolean(True).set_context(self.context), None
+            return Boolean.true(), None
         elif isinstance(other, Array):
-            return Boolean(True).set_context(self.context), None
+            return Boolean.true(), None
         else:
             return None, Value.illegal_operation(self, other)
 
@@ -398,6 +488,10 @@ class Boolean(Value):
     def is_true(self) -> bool:
         return self.value
 
+    def hash_key(self) -> HashResult:
+        # `true == 1` and `false == 0`, so booleans have the keys of these numbers
+        return (Number, self.value), None
+
     def __len__(self) -> int:
         return 1 if self.value else 0
 
@@ -422,20 +516,33 @@ Example: true
 
     @classmethod
     def true(cls) -> Boolean:
-        return cls(True)
+        return TRUE
 
     @classmethod
     def false(cls) -> Boolean:
-        return cls(False)
+        return FALSE
+
+
+TRUE = Boolean(True)
+FALSE = Boolean(False)
 
 
 class String(Value):
+    __slots__ = ("value",)
+
     value: str
 
     def __init__(self, value: str) -> None:
         super().__init__()
         self.value = value
 
+    @classmethod
+    def of(cls, value: str) -> String:
+        """A string with the given value, the empty string is interned"""
+        if value == "":
+            return EMPTY_STRING
+        return cls(value)
+
     def added_to(self, other: Value) -> ResultTuple:
         if isinstance(other, String):
             return String(self.value + other.value).set_context(self.context), None
@@ -444,6 +551,15 @@ class String(Value):
         else:
             return None, Value.illegal_operation(self, other)
 
+    def added_in_place(self, other: Value) -> ResultTuple:
+        if isinstance(other, String):
+            part = other.value
+        elif isinstance(other, Number):
+            part = str(other.value)
+        else:
+            return None, Value.illegal_operation(self, other)
+        return AppendedString([self.value, part], 2).set_context(self.context), None
+
     def multed_by(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
             return String(self.value * int(other.value)).set_context(self.context), None
@@ -452,21 +568,21 @@ class String(Value):
 
     def get_comparison_eq(self, other: Value) -> ResultTuple:
         if isinstance(other, String):
-            return Boolean(self.value == other.value).set_context(self.context), None
+            return Boolean.of(self.value == other.value), None
         elif isinstance(other, Array):
-            return Boolean(False).set_context(self.context), None
+            return Boolean.false(), None
         elif isinstance(other, Number):
-            return Boolean(False).set_context(self.context), None
+            return Boolean.false(), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_ne(self, other: Value) -> ResultTuple:
         if isinstance(other, String):
-            return Boolean(self.value != other.value).set_context(self.context), None
+            return Boolean.of(self.value != other.value), None
         elif isinstance(other, Array):
-            return Boolean(True).set_context(self.context), None
+            return Boolean.true(), None
         elif isinstance(other, Number):
-            return Boolean(True).set_context(self.context), None
+            return Boolean.true(), None
         else:
             return None, Value.illegal_operation(self, other)
 
@@ -514,20 +630,25 @@ class String(Value):
             return None, self.illegal_operation(index)
         if not isinstance(value, String):
             return None, self.illegal_operation(value)
+        # Strings are immutable (values are shared between variables), the result is a new string
         try:
-            self.value = self.value[: int(index.value)] + value.value + self.value[int(index.value + 1) :]
+            new_value = self.value[: int(index.value)] + value.value + self.value[int(index.value + 1) :]
         except IndexError:
             return None, RNIndexError(index.pos_start, index.pos_end, "String index out of range", self.context)
-        return self, None
+        return String(new_value).set_context(self.context), None
 
     def contains(self, other: Value) -> ResultTuple:
         if not isinstance(other, String):
             return None, self.illegal_operation(other)
-        return Boolean(other.value in self.value), None
+        return Boolean.of(other.value in self.value), None
 
     def is_true(self) -> bool:
         return len(self.value) > 0
 
+    def hash_key(self) -> HashResult:
+        # The keys of `HashMap.values`
+        return self.value, None
+
     def copy(self) -> String:
         copy = String(self.value)
         copy.set_pos(self.pos_start, self.pos_end)
@@ -571,22 +692,83 @@ Example: "Hello World!"
         return len(self.value)
 
 
+EMPTY_STRING = String("")
+
+
+class AppendedString(String):
+    """A string built with `+=`, in amortized linear time instead of quadratic
+
+    Its parts are the first `count` strings of `parts`, a list shared with the strings it was built from and the
+    strings built from it. Appending to the string built last appends to the list instead of copying the parts, and
+    strings are immutable: `parts` only grows, so the first `count` parts never change. The parts are joined once,
+    when the value of the string is used.
+    """
+
+    __slots__ = ("parts", "count", "joined")
+
+    parts: list[str]
+    count: int
+    joined: Optional[str]
+
+    def __init__(self, parts: list[str], count: int) -> None:
+        Value.__init__(self)
+        self.parts = parts
+        self.count = count
+        self.joined = None
+
+    @property
+    def value(self) -> str:
+        if self.joined is None:
+            self.joined = "".join(self.parts[: self.count])
+        return self.joined
+
+    @value.setter
+    def value(self, value: str) -> None:
+        self.parts = [value]
+        self.count = 1
+        self.joined = value
+
+    def added_in_place(self, other: Value) -> ResultTuple:
+        if isinstance(other, String):
+            part = other.value
+        elif isinstance(other, Number):
+            part = str(other.value)
+        else:
+            return None, Value.illegal_operation(self, other)
+
+        if self.count == len(self.parts):
+            self.parts.append(part)
+            parts = self.parts
+        else:
+            # A longer string was already built from this one
+            parts = self.parts[: self.count] + [part]
+        return AppendedString(parts, self.count + 1).set_context(self.context), None
+
+
 class Array(Value):
+    __slots__ = ("elements",)
+
+    elements: list[Value]
+
     def __init__(self, elements: list[Value]) -> None:
         super().__init__()
         self.elements = elements
 
     def added_to(self, other: Value) -> ResultTuple:
-        new_array = self.copy()
+        new_array = Array(self.elements + other.elements if isinstance(other, Array) else self.elements + [other])
+        return new_array.set_pos(self.pos_start, self.pos_end).set_context(self.context), None
+
+    def added_in_place(self, other: Value) -> ResultTuple:
+        # Like lists in Python, `+=` extends the array itself
         if isinstance(other, Array):
-            new_array.elements.extend(other.elements)
+            self.elements.extend(other.elements)
         else:
-            new_array.elements.append(other)
-        return new_array, None
+            self.elements.append(other)
+        return self, None
 
     def subbed_by(self, other: Value) -> ResultTuple:
         if isinstance(other, Number):
-            new_array = self.copy()
+            new_array = Array(self.elements[:]).set_pos(self.pos_start, self.pos_end).set_context(self.context)
             try:
                 new_array.elements.pop(int(other.value))
                 return new_array, None
@@ -602,13 +784,11 @@ class Array(Value):
 
     def multed_by(self, other: Value) -> ResultTuple:
         if isinstance(other, Array):
-            new_array = self.copy()
-            new_array.elements.extend(other.elements)
-            return new_array, None
+            new_array = Array(self.elements + other.elements)
+            return new_array.set_pos(self.pos_start, self.pos_end).set_context(self.context), None
         elif isinstance(other, Number):
-            new_array = self.copy()
-            new_array.elements *= int(other.value)
-            return new_array, None
+            new_array = Array(self.elements * int(other.value))
+            return new_array.set_pos(self.pos_start, self.pos_end).set_context(self.context), None
         else:
             return None, Value.illegal_operation(self, other)
 
@@ -713,6 +893,16 @@ class Array(Value):
     def is_true(self) -> bool:
         return len(self.elements) > 0
 
+    def hash_key(self) -> HashResult:
+        # Arrays are keys by their elements, for composite keys (`HashMap` keeps a copy of the arrays it uses as keys)
+        keys: list[Hashable] = []
+        for element in self.elements:
+            key, error = element.hash_key()
+            if error is not None:
+                return None, error
+            keys.append(key)
+        return (Array, tuple(keys)), None
+
     def copy(self) -> Array:
         copy: Array = Array(self.elements)
         copy.set_pos(self.pos_start, self.pos_end)
@@ -759,11 +949,41 @@ Example: [1,2,3,true,"Hello World!"]
 
 
 class HashMap(Value):
-    values: dict[str, Value]
+    """A hash table mapping any hashable value to a value
+
+    `values` maps the keys of the keys (see `Value.hash_key`) to the values: strings, the most common keys, are their
+    own keys. The keys which are not strings are kept in `keys`, by their keys too.
+    """
+
+    __slots__ = ("values", "keys")
 
-    def __init__(self, values: dict[str, Value]) -> None:
+    values: dict[Hashable, Value]
+    keys: dict[Hashable, Value]
+
+    def __init__(self, values: dict[Hashable, Value], keys: Optional[dict[Hashable, Value]] = None) -> None:
         super().__init__()
         self.values = values
+        self.keys = keys if keys is not None else {}
+
+    def key(self, hash_key: Hashable) -> Value:
+        """The key of the map with the given key"""
+        if isinstance(hash_key, str):
+            return String(hash_key)
+        return self.keys[hash_key]
+
+    def set(self, key: Value, value: Value) -> Optional[Error]:
+        if isinstance(key, String):
+            self.values[key.value] = value
+            return None
+
+        hash_key, error = key.hash_key()
+        if error is not None:
+            return error
+        if hash_key not in self.keys:
+            # Mutating the array used as a key must not change the key
+            self.keys[hash_key] = Array(list(key.elements)) if isinstance(key, Array) else key
+        self.values[hash_key] = value
+        return None
 
     def added_to(self, other: Value) -> ResultTuple:
         if not isinstance(other, HashMap):
@@ -772,45 +992,46 @@ class HashMap(Value):
         new_dict = self.copy()
         for key, value in other.values.items():
             new_dict.values[key] = value
+        for key, key_value in other.keys.items():
+            new_dict.keys.setdefault(key, key_value)
 
         return new_dict, None
 
     def gen(self) -> Generator[RTResult[Value], None, None]:
         fake_pos = Position(0, 0, 0, "<hashmap key>", "<native code>")
         for key in self.values.keys():
-            key_as_value = String(key).set_pos(fake_pos, fake_pos).set_context(self.context)
-            yield RTResult[Value]().success(key_as_value)
+            if isinstance(key, str):
+                key_as_value = String(key).set_pos(fake_pos, fake_pos).set_context(self.context)
+                yield RTResult[Value]().success(key_as_value)
+            else:
+                yield RTResult[Value]().success(self.keys[key])
 
     def get_index(self, index: Value) -> ResultTuple:
-        if not isinstance(index, String):
-            return None, self.illegal_operation(index)
+        if isinstance(index, String):
+            key: Optional[Hashable] = index.value
+        else:
+            key, error = index.hash_key()
+            if error is not None:
+                return None, error
 
         try:
-            return self.values[index.value], None
+            return self.values[key], None
         except KeyError:
-            return None, RNKeyError(
-                self.pos_start, self.pos_end, f"Key '{index.value}' not found in HashMap", self.context
-            )
+            key_repr = f"'{index.value}'" if isinstance(index, String) else repr(index)
+            return None, RNKeyError(self.pos_start, self.pos_end, f"Key {key_repr} not found in HashMap", self.context)
 
     def set_index(self, index: Value, value: Value) -> ResultTuple:
-        if not isinstance(index, String):
-            return None, self.illegal_operation(index)
-
-        self.values[index.value] = value
+        error = self.set(index, value)
+        if error is not None:
+            return None, error
 
         return self, None
 
     def contains(self, other: Value) -> ResultTuple:
-        ret = Boolean.false()
-        for val in self.values.keys():
-            cmp, err = other.get_comparison_eq(String(val))
-            if err:
-                return None, err
-            assert cmp is not None
-            if cmp.is_true():
-                ret = Boolean.true()
-                break
-        return ret, None
+        key, error = other.hash_key()
+        if error is not None:
+            return None, error
+        return Boolean.of(key in self.values), None
 
     def get_comparison_eq(self, other: Value) -> ResultTuple:
         if not isinstance(other, HashMap):
@@ -856,7 +1077,7 @@ class HashMap(Value):
         return len(self.values)
 
     def copy(self) -> HashMap:
-        copy = HashMap(self.values)
+        copy = HashMap(dict(self.values), dict(self.keys))
         copy.set_pos(self.pos_start, self.pos_end)
         copy.set_context(self.context)
         return copy
@@ -874,7 +1095,9 @@ Example: {"key":"value"}
 """
 
     def __repr__(self) -> str:
-        __val = ", ".join([f"{repr(k)}: {repr(v)}" for k, v in self.values.items()])
+        __val = ", ".join(
+            [f"{repr(k if isinstance(k, str) else self.keys[k])}: {repr(v)}" for k, v in self.values.items()]
+        )
         return f"{{{__val}}}"
 
 
@@ -904,13 +1127,13 @@ class Type(Value):
 
     def get_comparison_eq(self, other: Value) -> ResultTuple:
         if isinstance(other, Type):
-            return Boolean(self.type == other.type).set_context(self.context), None
+            return Boolean.of(self.type == other.type), None
         else:
             return None, Value.illegal_operation(self, other)
 
     def get_comparison_ne(self, other: Value) -> ResultTuple:
         if isinstance(other, Type):
-            return Boolean(self.type != other.type).set_context(self.context), None
+            return Boolean.of(self.type != other.type), None
         else:
             return None, Value.illegal_operation(self, other)
 
@@ -923,15 +1146,21 @@ def radonify(value: object, pos_start: Position, pos_end: Position, context: Con
             case False:
                 return Boolean.false()
             case dict():
-                _value1: dict[str, Value] = value
-                return HashMap({k: radonify(v, pos_start, pos_end, context) for k, v in _value1.items()})
+                _value1: dict[object, object] = value
+                hashmap = HashMap({})
+                for k, v in _value1.items():
+                    if isinstance(k, str):
+                        hashmap.values[k] = radonify(v, pos_start, pos_end, context)
+                    else:
+                        hashmap.set(radonify(k, pos_start, pos_end, context), radonify(v, pos_start, pos_end, context))
+                return hashmap
             case list():
                 _value2: list[Value] = value
                 return Array([radonify(v, pos_start, pos_end, context) for v in _value2])
             case str():
-                return String(value)
+                return String.of(value)
             case int() | float():
-                return Number(value)
+                return Number.of(value)
             case None:
                 return Null.null()
             case _ if inspect.isfunction(value):
@@ -957,7 +1186,11 @@ def radonify(value: object, pos_start: Position, pos_end: Position, context: Con
             case _:
                 return PyObj(value)
 
-    return _radonify(value).set_pos(pos_start, pos_end).set_context(context)
+    radonified = _radonify(value)
+    if isinstance(radonified, (Boolean, Number, String, Null)):
+        # May be interned (see `SMALL_INTS`), these are never relocated
+        return radonified
+    return radonified.set_pos(pos_start, pos_end).set_context(context)
 
 
 def deradonify(value: Optional[Value]) -> str | dict[str, Any] | int | float | list[object] | object:
@@ -967,7 +1200,9 @@ def deradonify(value: Optional[Value]) -> str | dict[str, Any] | int | float | l
         case String():
             return str(value.value)
         case HashMap():
-            return {k: deradonify(v) for k, v in value.values.items()}
+            return {
+                k if isinstance(k, str) else deradonify(value.keys[k]): deradonify(v) for k, v in value.values.items()
+            }
         case Number():
             return value.value
         case Array():
@@ -1028,6 +1263,7 @@ class PyAPI(Value):
             assert isinstance(new_ns, HashMap)
             for key, value in new_ns.values.items():
                 ns.values[key] = value
+            ns.keys.update(new_ns.keys)
 
         except Exception as e:
             return RTResult[Value]().failure(
@@ -1074,6 +1310,18 @@ class BaseFunction(Value):
     ) -> RTResult[None]:
         res = RTResult[None]()
 
+        # Checked first, so an unknown keyword isn't reported as a wrong number of args
+        for kw in kwargs.keys():
+            if kw not in arg_names:
+                return res.failure(
+                    RTError(
+                        self.pos_start,
+                        self.pos_end,
+                        f"{kw} is not a valid keyword arg passed into {self}",
+                        self.context,
+                    )
+                )
+
         args_count = len(args) + len(kwargs)
         if self.va_name is None and (args_count > len(arg_names) or len(args) > max_pos_args):
             return res.failure(
@@ -1096,17 +1344,6 @@ class BaseFunction(Value):
                 )
             )
 
-        for kw in kwargs.keys():
-            if kw not in arg_names:
-                return res.failure(
-                    RTError(
-                        self.pos_start,
-                        self.pos_end,
-                        f"{kw} is not a valid keyword arg passed into {self}",
-                        self.context,
-                    )
-                )
-
         return res.success(None)
 
     def populate_args(
@@ -1127,21 +1364,16 @@ class BaseFunction(Value):
             arg_name = arg_names[i]
             if i >= max_pos_args or arg_name in kwargs or i >= len(args):
                 continue
-            arg_value = args[i]
-            arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name, arg_value)
+            exec_ctx.symbol_table.set(arg_name, args[i])
             populated += 1
 
         if self.va_name is not None:
             va_list: list[Value] = []
             for i in range(populated, len(args)):
-                arg = args[i]
-                arg.set_context(exec_ctx)
-                va_list.append(arg)
+                va_list.append(args[i])
             exec_ctx.symbol_table.set(self.va_name, Array(va_list))
 
         for kw, kwarg in kwargs.items():
-            kwarg.set_context(exec_ctx)
             exec_ctx.symbol_table.set(kw, kwarg)
 
     def check_and_populate_args(
@@ -1162,10 +1394,15 @@ class BaseFunction(Value):
 
 
 class BaseInstance(Value, ABC):
+    # Methods bound to the instance by the name they were accessed with, next to the method they were bound from. A
+    # method replaced in the class (or shadowed by a field) replaces the entry of its name, so stale copies don't linger
+    bound_methods: dict[str, tuple[BaseFunction, BaseFunction]]
+
     def __init__(self, parent_class: BaseClass, symbol_table: Optional[SymbolTable]):
         super().__init__()
         self.parent_class = parent_class
         self.symbol_table = SymbolTable(symbol_table)
+        self.bound_methods = {}
 
     @abstractmethod
     def operator(self, operator: str, *args: Value) -> ResultTuple: ...
@@ -1173,6 +1410,20 @@ class BaseInstance(Value, ABC):
     @abstractmethod
     def bind_method(self, method: BaseFunction) -> RTResult[BaseFunction]: ...
 
+    def get_bound_method(self, name: str, method: BaseFunction) -> RTResult[BaseFunction]:
+        """Same as `bind_method`, but binds the method found under `name` only once while it stays the same"""
+        bound_method = self.bound_methods.get(name)
+        if bound_method is not None and bound_method[0] is method:
+            return RTResult[BaseFunction]().success(bound_method[1])
+
+        res = RTResult[BaseFunction]()
+        new_method = res.register(self.bind_method(method))
+        if res.should_return():
+            return res
+        assert new_method is not None
+        self.bound_methods[name] = (method, new_method)
+        return res.success(new_method)
+
     def added_to(self, other: Value) -> ResultTuple:
         return self.operator("__add__", other)
 
@@ -1238,13 +1489,28 @@ class BaseInstance(Value, ABC):
         assert res is not None
         return res.is_true()
 
+    def hash_key(self) -> HashResult:
+        # Like in Python, instances are only equal to themselves unless their class says otherwise
+        return self, None
+
     def copy(self: Self) -> Self:
         return self
 
 
 class Instance(BaseInstance):
+    """An instance of a class defined in Radon
+
+    Instances only hold their own fields (and `this`): methods and static members are looked up in the symbol table
+    of their class, the parent of the symbol table of the instance, so they are shared by all the instances instead of
+    being copied into each of them. Reassigning a member of the class (`Counter.get = ...`) changes it for the existing
+    instances too, unless they have a field of the same name.
+    """
+
+    parent_class: Class
+
     def __init__(self, parent_class: Class) -> None:
-        super().__init__(parent_class, None)
+        super().__init__(parent_class, parent_class.symbol_table)
+        self.symbol_table.set("this", self)
 
     def __exec_len__(self) -> Value | Null:
         try:
@@ -1262,32 +1528,57 @@ class Instance(BaseInstance):
             result += f" |\t{j}\n"
         result += " |\n"
 
-        for k in self.symbol_table.symbols:
-            f = self.symbol_table.symbols[k]
+        members = self.members()
+        for k in members:
+            f = members[k]
             if isinstance(f, Function):
                 result += f.__help_repr_method__()
             elif isinstance(f, Value) and k != "this":
                 result += f" |  {k} = {f!r}\n|\n"
         return result
 
+    def get(self, name: str) -> Optional[Value]:
+        """Look up an attribute in the fields of the instance, then in its class"""
+        value = self.symbol_table.symbols.get(name, None)
+        if value is None:
+            return self.parent_class.get(name)
+        return value
+
+    def members(self) -> dict[str, Value]:
+        """The members of the class, then the fields of the instance (which may shadow them)"""
+        return self.parent_class.symbol_table.symbols | self.symbol_table.symbols
+
+    def hash_key(self) -> HashResult:
+        if self.get("__hash__") is None:
+            return super().hash_key()
+
+        value, error = self.operator("__hash__")
+        if error is not None:
+            return None, error
+        if not isinstance(value, Number) or not isinstance(value.value, int):
+            return None, RNTypeError(self.pos_start, self.pos_end, "__hash__() should return an integer", self.context)
+        return HashedInstance(self, value.value), None
+
     def bind_method(self, method: BaseFunction) -> RTResult[BaseFunction]:
-        method = method.copy()
-        if method.symbol_table is None:
-            method.symbol_table = SymbolTable()
-        method.symbol_table.set("this", self)
-        return RTResult[BaseFunction]().success(method)
+        # `this` is set next to the arguments of each call of the bound copy, so the method keeps the scopes it was
+        # defined in (the ones `core.resolver` resolves its variables to). Other callables don't see `this`
+        if not isinstance(method, Function):
+            return RTResult[BaseFunction]().success(method)
+        bound_method = method.copy()
+        bound_method.this = self
+        return RTResult[BaseFunction]().success(bound_method)
 
     def operator(self, operator: str, *args: Value) -> ResultTuple:
         res = RTResult[Value]()
-        method = self.symbol_table.symbols.get(operator, None)
+        method = self.get(operator)
 
         if method is None or not isinstance(method, Function):
             return None, RTError(self.pos_start, self.pos_end, f"Function '{operator}' not defined", self.context)
-        if method.symbol_table is None:
-            method.symbol_table = SymbolTable()
-        method.symbol_table.set("this", self)
+        bound_method = res.register(self.get_bound_method(operator, method))
+        assert bound_method is not None
+        bound_method.set_context(self.parent_class.method_context())
 
-        value = res.register(method.execute(list(args), {}))
+        value = res.register(bound_method.execute(list(args), {}))
         if res.error is not None:
             return None, res.error
         assert value is not None
@@ -1298,6 +1589,76 @@ class Instance(BaseInstance):
         return f"<instance of class {self.parent_class.name}>"
 
 
+class HashedInstance:
+    """The key of an instance whose class defines `__hash__`
+
+    Keys are equal when their instances are equal according to `__eq__` (or are the same instance, if the class
+    doesn't define it).
+    """
+
+    __slots__ = ("instance", "hash")
+
+    instance: Instance
+    hash: int
+
+    def __init__(self, instance: Instance, hash: int) -> None:
+        self.instance = instance
+        self.hash = hash
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, HashedInstance):
+            return False
+        if self.instance is other.instance:
+            return True
+        if self.instance.get("__eq__") is None:
+            return False
+        result, error = self.instance.get_comparison_eq(other.instance)
+        return error is None and result is not None and result.is_true()
+
+
+class AttributeCache:
+    """Inline cache of an attribute access (`obj.name`) of a program
+
+    Caches the member of a class the access found last, until the symbol table of the class changes (see
+    `SymbolTable.version`). It is monomorphic: accessing the attribute on the instances of another class replaces it.
+    The fields of an instance are always looked up first, since they shadow the members of its class.
+    """
+
+    __slots__ = ("name", "table", "version", "value")
+
+    name: str
+    table: Optional[SymbolTable]
+    version: int
+    value: Optional[Value]
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.table = None
+        self.version = 0
+        self.value = None
+
+    def get(self, obj: BaseClass | BaseInstance | Module) -> Optional[Value]:
+        """Look up the attribute like `obj.symbol_table.get(name)`"""
+        if not isinstance(obj, BaseInstance):
+            return obj.symbol_table.get(self.name)
+
+        value = obj.symbol_table.symbols.get(self.name, None)
+        if value is not None:
+            return value
+
+        table = obj.symbol_table.parent
+        if table is self.table and table is not None and table.version == self.version:
+            return self.value
+
+        value = obj.symbol_table.get(self.name)
+        if table is not None and self.name in table.symbols:
+            self.table, self.version, self.value = table, table.version, value
+        return value
+
+
 class BaseClass(Value, ABC):
     name: str
     desc: Optional[str]
@@ -1329,15 +1690,25 @@ class BaseClass(Value, ABC):
     def init(self, inst: BaseInstance, args: list[Value], kwargs: dict[str, Value]) -> RTResult[None]: ...
 
     def execute(self, args: list[Value], kwargs: dict[str, Value]) -> RTResult[Value]:
+        return self.call(args, kwargs, self.pos_start, self.pos_end, self.context)
+
+    def call(
+        self, args: list[Value], kwargs: dict[str, Value], pos_start: Position, pos_end: Position, context: Context
+    ) -> RTResult[Value]:
         res = RTResult[Value]()
 
         inst = res.register(self.create(args))
         if res.should_return():
+            if res.error is not None:
+                located_error(res.error, (self,), pos_start, pos_end, context)
             return res
         assert inst is not None
+        inst.set_context(context).set_pos(pos_start, pos_end)
 
         res.register(self.init(inst, args, kwargs))
         if res.should_return():
+            if res.error is not None:
+                located_error(res.error, (self,), pos_start, pos_end, context)
             return res
         return res.success(inst)
 
@@ -1346,6 +1717,12 @@ class BaseClass(Value, ABC):
 
 
 class Class(BaseClass):
+    _method_context: Optional[Context]
+
+    def __init__(self, name: str, desc: Optional[str], symbol_table: SymbolTable) -> None:
+        super().__init__(name, desc, symbol_table)
+        self._method_context = None
+
     def get(self, name: str) -> Optional[Value]:
         method = self.symbol_table.symbols.get(name, None)
         if method is None:
@@ -1371,37 +1748,34 @@ class Class(BaseClass):
                 result += f" |  {Log.deep_white(k, bold=True)} = {f!r}\n |\n"
         return result
 
+    def method_context(self) -> Context:
+        """The context of the methods called by the runtime (the constructor and operators)"""
+        if self._method_context is None:
+            self._method_context = Context(f"<class {self.name}>", self.context, self.pos_start)
+            self._method_context.symbol_table = self.symbol_table
+        return self._method_context
+
     def create(self, args: list[Value]) -> RTResult[BaseInstance]:
         res = RTResult[BaseInstance]()
 
         # TODO: Some issue here when direct accessing class methods without instantiation
         inst = Instance(self)
-        inst.symbol_table = SymbolTable(self.symbol_table)
-
-        for name in self.symbol_table.symbols:
-            inst.symbol_table.set(name, self.symbol_table.symbols[name].copy())
-
-        exec_ctx = Context(f"<class {self.name}>", self.context, self.pos_start)
-        exec_ctx.symbol_table = inst.symbol_table
-        for name in inst.symbol_table.symbols:
-            inst.symbol_table.symbols[name].set_context(exec_ctx)
-
-        inst.symbol_table.set("this", inst)
         return res.success(inst.set_context(self.context).set_pos(self.pos_start, self.pos_end))
 
     def init(self, inst: BaseInstance, args: list[Value], kwargs: dict[str, Value]) -> RTResult[None]:
         res = RTResult[None]()
         # if constructor is not defined, create a default one
-        method = inst.symbol_table.symbols.get(
-            "__constructor__",
-            Function("__constructor__", inst.symbol_table, NullNode(None, None), [], [], True, "", "", 0),  # type: ignore
-        )
+        method = self.get("__constructor__")
+        if not isinstance(method, BaseFunction):
+            method = Function("__constructor__", self.symbol_table, DEFAULT_CONSTRUCTOR_BODY, [], [], True, "", "", 0)
 
-        if method.symbol_table is None:  # type: ignore
-            method.symbol_table = SymbolTable()  # type: ignore
-        method.symbol_table.set("this", inst)  # type: ignore
+        constructor = res.register(inst.bind_method(method))
+        if res.should_return():
+            return res
+        assert constructor is not None
+        constructor.set_context(self.method_context())
 
-        res.register(method.execute(args, kwargs))
+        res.register(constructor.execute(args, kwargs))
         if res.should_return():
             return res
 
@@ -1417,6 +1791,8 @@ class Function(BaseFunction):
     defaults: list[Optional[Value]]
     should_auto_return: bool
     max_pos_args: int
+    # The instance a method is bound to, set as `this` next to the arguments of each call (see `Instance.bind_method`)
+    this: Optional[Value]
 
     def __help_repr__(self) -> str:
         return f"Help on function {Log.deep_white(self.name, bold=True)}:\n\n{self.__help_repr_method__()}"
@@ -1458,31 +1834,59 @@ class Function(BaseFunction):
         self.desc = desc
         self.va_name = va_name
         self.max_pos_args = max_pos_args
+        self.this = None
 
     def execute(self, args: list[Value], kwargs: dict[str, Value]) -> RTResult[Value]:
-        from core.interpreter import Interpreter  # Lazy import
+        return self.call(args, kwargs, self.pos_start, self.pos_end, self.context)
 
+    def call(
+        self, args: list[Value], kwargs: dict[str, Value], pos_start: Position, pos_end: Position, context: Context
+    ) -> RTResult[Value]:
         res = RTResult[Value]()
-        interpreter = Interpreter()
-        exec_ctx = self.generate_new_context()
-
-        res.register(
-            self.check_and_populate_args(self.arg_names, args, kwargs, self.defaults, self.max_pos_args, exec_ctx)
-        )
-        if res.should_return():
-            return res
+        if limits.depth >= limits.max_depth:
+            return res.failure(
+                RNRecursionError(pos_start, pos_end, f"Maximum call depth exceeded ({limits.max_depth} calls)", context)
+            )
 
-        value = res.register(interpreter.visit(self.body_node, exec_ctx))
-        if res.should_return() and res.func_return_value is None:
-            return res
+        # Tail calls run in this loop instead of growing the stack: the called function replaces the one returning,
+        # as if it had been called from where this function was
+        function: Function = self
+        parent, parent_entry_pos = context, pos_start
 
-        if self.should_auto_return:
-            ret_value = value
-        else:
-            ret_value = res.func_return_value
-        if ret_value is None:
-            ret_value = Null.null()
-        return res.success(ret_value)
+        limits.depth += 1
+        try:
+            while True:
+                exec_ctx = function.generate_new_context()
+                exec_ctx.parent, exec_ctx.parent_entry_pos = parent, parent_entry_pos
+                if function.this is not None:
+                    exec_ctx.symbol_table.set("this", function.this)
+
+                res.register(
+                    function.check_and_populate_args(
+                        function.arg_names, args, kwargs, function.defaults, function.max_pos_args, exec_ctx
+                    )
+                )
+                if res.should_return():
+                    assert res.error is not None
+                    located_error(res.error, (function,), pos_start, pos_end, context)
+                    return res
+
+                value = res.register(engines.get_interpreter().visit(function.body_node, exec_ctx))
+                if res.tail_call is not None:
+                    function, args, kwargs, pos_start, pos_end, context = res.tail_call
+                    continue
+                if res.should_return() and res.func_return_value is None:
+                    return res
+
+                if function.should_auto_return:
+                    ret_value = value
+                else:
+                    ret_value = res.func_return_value
+                if ret_value is None:
+                    ret_value = Null.null()
+                return res.success(ret_value)
+        finally:
+            limits.depth -= 1
 
     def copy(self) -> Function:
         copy = Function(
@@ -1496,6 +1900,7 @@ class Function(BaseFunction):
             self.va_name,
             self.max_pos_args,
         )
+        copy.this = self.this
         copy.set_context(self.context)
         copy.set_pos(self.pos_start, self.pos_end)
         return copy
@@ -1527,15 +1932,21 @@ class Module(Value):
 
 
 class Null(Value):
+    __slots__ = ()
+
     def __repr__(self) -> str:
         return "null"
 
     def copy(self) -> Null:
-        return self
+        # `NULL` is interned, a copy is a new value that can be placed
+        return Null()
 
     def is_true(self) -> bool:
         return False
 
+    def hash_key(self) -> HashResult:
+        return (Null,), None
+
     def get_comparison_eq(self, other: Value) -> ResultTuple:
         if isinstance(other, Null):
             return Boolean.true(), None
@@ -1550,4 +1961,7 @@ class Null(Value):
 
     @classmethod
     def null(cls) -> Null:
-        return cls()
+        return NULL
+
+
+NULL = Null()
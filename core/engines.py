@@ -0,0 +1,57 @@
+"""Execution engines
+
+Radon programs can be executed by different engines, all of them sharing the same semantics:
+
+    tree     - the tree-walking `Interpreter` (default)
+    closure  - compiles the AST into a tree of specialized Python closures (see `core.closures`)
+    vm       - compiles the AST into bytecode run by a stack-based virtual machine (see `core.vm`)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from core.interpreter import Interpreter
+
+ENGINES = ["tree", "closure", "vm"]
+
+# Engine used to execute programs and function calls
+current_engine: str = "tree"
+
+# Interpreter of the current engine, shared by the programs and all function calls (interpreters are stateless)
+interpreter: Optional[Interpreter] = None
+
+
+def set_engine(name: str) -> None:
+    global current_engine, interpreter
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}' (available engines: {', '.join(ENGINES)})")
+    if name != current_engine:
+        interpreter = None
+    current_engine = name
+
+
+def get_interpreter() -> Interpreter:
+    """The interpreter of the current engine, created on first use"""
+    global interpreter
+    if interpreter is None:
+        interpreter = create_interpreter()
+    return interpreter
+
+
+def create_interpreter() -> Interpreter:
+    """Create an interpreter for the current engine"""
+    match current_engine:
+        case "closure":
+            from core.closures import ClosureInterpreter  # Lazy import
+
+            return ClosureInterpreter()
+        case "vm":
+            from core.vm import VMInterpreter  # Lazy import
+
+            return VMInterpreter()
+        case _:
+            from core.interpreter import Interpreter  # Lazy import
+
+            return Interpreter()
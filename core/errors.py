@@ -152,6 +152,36 @@ class RTError(Error):
         return type(self)(self.pos_start, self.pos_end, self.details, self.context)
 
 
+class RNRecursionError(RTError):
+    """Recursion Error class, for calls nested deeper than `limits.max_depth`"""
+
+    # Like Python, a frame repeated more than this is only shown this many times
+    MAX_REPEATED_FRAMES = 3
+
+    def __init__(
+        self, pos_start: Position, pos_end: Position, details: Optional[str], context: Optional[Context]
+    ) -> None:
+        super().__init__(pos_start, pos_end, details, context)
+        self.error_name = "RecursionError"
+
+    def generate_radiation(self) -> str:
+        header, *frames = super().generate_radiation().splitlines(keepends=True)
+        result = header
+        i = 0
+        while i < len(frames):
+            repeated = 1
+            while i + repeated < len(frames) and frames[i + repeated] == frames[i]:
+                repeated += 1
+            result += frames[i] * min(repeated, self.MAX_REPEATED_FRAMES)
+            if repeated > self.MAX_REPEATED_FRAMES:
+                result += f"  [Previous line repeated {repeated - self.MAX_REPEATED_FRAMES} more times]\n"
+            i += repeated
+        return result
+
+    def copy(self) -> RNRecursionError:
+        return RNRecursionError(self.pos_start, self.pos_end, self.details, self.context)
+
+
 class TryError(Error):
     prev_error: RTError
 
@@ -1,14 +1,17 @@
+import operator
 import os
 import sys
-from typing import Callable, NoReturn, Optional
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, NamedTuple, NoReturn, Optional, TypeAlias
 
 from core.builtin_funcs import create_global_symbol_table, run
 from core.colortools import Log
 from core.datatypes import (
     Array,
+    AttributeCache,
     BaseClass,
     BaseFunction,
     BaseInstance,
+    Boolean,
     Class,
     Function,
     HashMap,
@@ -16,8 +19,10 @@ from core.datatypes import (
     Module,
     Null,
     Number,
+    ResultTuple,
     String,
     Value,
+    located_error,
 )
 from core.errors import Error, RNModuleNotFoundError, RNNameError, RTError, TryError
 from core.nodes import (
@@ -25,9 +30,11 @@ from core.nodes import (
     AssertNode,
     AttrAccessNode,
     BinOpNode,
+    BlockNode,
     BreakNode,
     CallNode,
     ClassNode,
+    ConstantNode,
     ContinueNode,
     DecNode,
     FalloutNode,
@@ -72,13 +79,132 @@ from core.tokens import (
     TT_MOD,
     TT_MUL,
     TT_NE,
+    TT_PE,
     TT_PLUS,
     TT_POW,
     Position,
     Token,
+    TokenType,
     TokenValue,
 )
 
+if TYPE_CHECKING:
+    from core.closures import CompiledNode
+    from core.vm import CodeNode
+
+BinaryOperation: TypeAlias = Callable[[Value, Value], ResultTuple]
+
+BINARY_OPERATIONS: dict[TokenType, BinaryOperation] = {
+    TT_PLUS: lambda left, right: left.added_to(right),
+    TT_PE: lambda left, right: left.added_in_place(right),
+    TT_MINUS: lambda left, right: left.subbed_by(right),
+    TT_MUL: lambda left, right: left.multed_by(right),
+    TT_DIV: lambda left, right: left.dived_by(right),
+    TT_POW: lambda left, right: left.powed_by(right),
+    TT_MOD: lambda left, right: left.modded_by(right),
+    TT_EE: lambda left, right: left.get_comparison_eq(right),
+    TT_NE: lambda left, right: left.get_comparison_ne(right),
+    TT_LT: lambda left, right: left.get_comparison_lt(right),
+    TT_GT: lambda left, right: left.get_comparison_gt(right),
+    TT_LTE: lambda left, right: left.get_comparison_lte(right),
+    TT_GTE: lambda left, right: left.get_comparison_gte(right),
+    TT_IDIV: lambda left, right: left.idived_by(right),
+}
+
+KEYWORD_OPERATIONS: dict[str, BinaryOperation] = {
+    "and": lambda left, right: left.anded_by(right),
+    "or": lambda left, right: left.ored_by(right),
+    "in": lambda left, right: right.contains(left),
+}
+
+
+# Operations on two numbers, computed directly on their Python values. Their results are the same as the methods of
+# `Number`, a `ZeroDivisionError` falls back to these methods to report the error (or raise it again)
+NumberOperation: TypeAlias = tuple[Callable[[Any, Any], Any], type[Number] | type[Boolean]]
+
+NUMBER_OPERATIONS: dict[TokenType, NumberOperation] = {
+    TT_PLUS: (operator.add, Number),
+    TT_PE: (operator.add, Number),
+    TT_MINUS: (operator.sub, Number),
+    TT_MUL: (operator.mul, Number),
+    TT_DIV: (operator.truediv, Number),
+    TT_POW: (operator.pow, Number),
+    TT_MOD: (operator.mod, Number),
+    TT_IDIV: (lambda left, right: int(left // right), Number),
+    TT_EE: (operator.eq, Boolean),
+    TT_NE: (operator.ne, Boolean),
+    TT_LT: (operator.lt, Boolean),
+    TT_GT: (operator.gt, Boolean),
+    TT_LTE: (operator.le, Boolean),
+    TT_GTE: (operator.ge, Boolean),
+}
+
+
+# `and` and `or` short-circuit: when the left operand is a boolean or a number deciding the result, the right operand
+# is not evaluated. The result is the same as with both operands evaluated (a number for numbers, a boolean for
+# booleans). Other values always evaluate both operands, so instances overloading `__and__`/`__or__` keep working.
+# NOTE: before short-circuiting, the right operand was always evaluated, along with its side effects and errors
+ShortCircuit: TypeAlias = Callable[[Value], Optional[Value]]
+
+
+def short_circuit_and(left: Value) -> Optional[Value]:
+    if type(left) is Boolean and not left.value:
+        return Boolean.false()
+    if type(left) is Number and left.value == 0:
+        return Number.of(0)
+    return None
+
+
+def short_circuit_or(left: Value) -> Optional[Value]:
+    if type(left) is Boolean and left.value:
+        return Boolean.true()
+    if type(left) is Number and left.value != 0:
+        return Number.of(int(left.value))
+    return None
+
+
+SHORT_CIRCUITS: dict[str, ShortCircuit] = {"and": short_circuit_and, "or": short_circuit_or}
+
+
+class Operation(NamedTuple):
+    """A binary operation, with its fast path for two numbers and its short-circuit (if any)"""
+
+    generic: BinaryOperation
+    number: Optional[NumberOperation]
+    short_circuit: Optional[ShortCircuit]
+
+
+def binary_operation(op_tok: Token) -> Operation:
+    if op_tok.type == TT_KEYWORD:
+        assert isinstance(op_tok.value, str)
+        operation = KEYWORD_OPERATIONS.get(op_tok.value)
+        assert operation is not None, f"invalid binary operation: {op_tok}, this is probably a bug in the parser."
+        return Operation(operation, None, SHORT_CIRCUITS.get(op_tok.value))
+
+    operation = BINARY_OPERATIONS.get(op_tok.type)
+    assert operation is not None, f"invalid binary operation: {op_tok}, this is probably a bug in the parser."
+    return Operation(operation, NUMBER_OPERATIONS.get(op_tok.type), None)
+
+
+def add_visit_notes(e: Exception) -> None:
+    """Note the nodes that were being visited when a Python exception (a bug in the interpreter) was raised
+
+    `Interpreter.visit` is the hottest function of the interpreter, so it doesn't catch exceptions: the nodes are found
+    in the frames of the visitor methods instead, once the exception reached the program.
+    """
+    if sys.version_info < (3, 11):
+        return
+    nodes: list[Node] = []
+    traceback = e.__traceback__
+    while traceback is not None:
+        node = traceback.tb_frame.f_locals.get("node")
+        if traceback.tb_frame.f_code.co_name.startswith("visit_") and isinstance(node, Node):
+            nodes.append(node)
+        traceback = traceback.tb_next
+    # Innermost node first
+    for node in reversed(nodes):
+        e.add_note(f"{node.pos_start} - {node.pos_end}: NOTE: happened here")
+
 
 def resolve_module(pos_start: Position, pos_end: Position, exec_ctx: Context, module_ident: str) -> RTResult[Module]:
     res = RTResult[Module]()
@@ -144,6 +270,13 @@ def resolve_module(pos_start: Position, pos_end: Position, exec_ctx: Context, mo
 
 
 class Interpreter:
+    # Visitor method of each node class, looked up on the first visit of the class (each subclass has its own table)
+    visitors: ClassVar[dict[type, Callable[[Any, Any, Context], RTResult[Value]]]] = {}
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls.visitors = {}
+
     def assign(
         self,
         *,
@@ -152,6 +285,7 @@ class Interpreter:
         context: Context,
         extra_names: list[Token] = [],
         qualifier: Optional[Token] = None,
+        depth: Optional[int] = None,
         pos_start: Position,
         pos_end: Position,
     ) -> RTResult[Value]:
@@ -174,26 +308,29 @@ class Interpreter:
                     return res.failure(RTError(pos_start, pos_end, "Value must be instance of class or class", context))
 
                 prev = nd
-                nd = nd.symbol_table.symbols[name] if name in nd.symbol_table.symbols else None
+                nd = nd.get(name) if isinstance(nd, Instance) else nd.symbol_table.symbols.get(name, None)
 
                 if nd is None and index != len(extra_names) - 1:
                     return res.failure(RTError(pos_start, pos_end, f"'{name}' not defined", context))
 
             assert prev is not None
             assert isinstance(name, str)
-            res.register(prev.symbol_table.set(name, value))
-            if res.should_return():
-                return res
+            error = prev.symbol_table.set(name, value).error
+            if error is not None:
+                return res.failure(located_error(error, (value,), pos_start, pos_end, context))
             return res.success(value)
 
         qualifier_str = None if qualifier is None else qualifier.value
         assert qualifier_str is None or isinstance(qualifier_str, str)
-        res.register(context.symbol_table.set_var(var_name, value, qualifier_str))
-        if res.should_return():
-            return res
+        error = context.symbol_table.set_var(var_name, value, qualifier_str, depth).error
+        if error is not None:
+            return res.failure(located_error(error, (value,), pos_start, pos_end, context))
         return res.success(value)
 
-    def call_value(self, value_to_call: Value, node: CallNode, context: Context) -> RTResult[Value]:
+    def call_value(
+        self, value_to_call: Value, node: CallNode, context: Context, tail_call: bool = False
+    ) -> RTResult[Value]:
+        """Call a value with the arguments of a call node, or make the call a tail call of a `Function`"""
         res = RTResult[Value]()
 
         args: list[Value] = []
@@ -212,24 +349,25 @@ class Interpreter:
             assert kwarg is not None
             kwargs[kw] = kwarg
 
-        return_value = res.register(value_to_call.execute(args, kwargs))
+        if tail_call and isinstance(value_to_call, Function):
+            return res.success_tail_call(value_to_call, args, kwargs, node.pos_start, node.pos_end, context)
+        return_value = res.register(value_to_call.call(args, kwargs, node.pos_start, node.pos_end, context))
         if res.should_return():
             return res
         assert return_value is not None
-        return_value = return_value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
         return res.success(return_value)
 
     def visit(self, node: Node, context: Context) -> RTResult[Value]:
-        method_name = f"visit_{type(node).__name__}"
-        method: Callable[[Node, Context], NoReturn] = getattr(self, method_name, self.no_visit_method)
-        try:
-            return method(node, context)
-        except Exception as e:
-            if sys.version_info >= (3, 11):
-                e.add_note(f"{node.pos_start} - {node.pos_end}: NOTE: happened here")
-            raise
-
-    def visit_block(self, node: Node, context: Context) -> RTResult[Value]:
+        visitor = self.visitors.get(type(node))
+        if visitor is None:
+            name = f"visit_{type(node).__name__}"
+            visitor = self.visitors[type(node)] = getattr(type(self), name, type(self).no_visit_method)
+        return visitor(self, node, context)
+
+    def visit_block(self, node: Node, context: Context, scoped: bool = True) -> RTResult[Value]:
+        if not scoped:
+            # Blocks declaring no variables run in the enclosing scope (see `core.resolver`)
+            return self.visit(node, context)
         new_context = Context("<block scope>", context, node.pos_start)
         new_context.symbol_table = SymbolTable(context.symbol_table)
         return self.visit(node, new_context)
@@ -237,22 +375,25 @@ class Interpreter:
     def no_visit_method(self, node: Node, context: Context) -> NoReturn:
         raise Exception(f"No visit_{type(node).__name__} method defined")
 
+    # Functions keep the body compiled by the engine that created them, which every other engine runs from its
+    # original node (the engine can be changed between programs, see `run`)
+
+    def visit_CompiledNode(self, node: "CompiledNode", context: Context) -> RTResult[Value]:
+        return self.visit(node.node, context)
+
+    def visit_CodeNode(self, node: "CodeNode", context: Context) -> RTResult[Value]:
+        return self.visit(node.node, context)
+
     ###################################
 
     def visit_NullNode(self, node: Node, context: Context) -> RTResult[Value]:
         return RTResult[Value]().success(Null.null())
 
     def visit_NumberNode(self, node: NumberNode, context: Context) -> RTResult[Value]:
-        assert isinstance(node.tok.value, int | float), "This could be a bug in the parser or the lexer"
-        return RTResult[Value]().success(
-            Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return RTResult[Value]().success(node.value)
 
     def visit_StringNode(self, node: StringNode, context: Context) -> RTResult[Value]:
-        assert isinstance(node.tok.value, str), "This could be a bug in the parser or the lexer"
-        return RTResult[Value]().success(
-            String(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        return RTResult[Value]().success(node.value)
 
     def visit_ArrayNode(self, node: ArrayNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
@@ -267,18 +408,33 @@ class Interpreter:
 
         return res.success(Array(elements).set_context(context).set_pos(node.pos_start, node.pos_end))
 
+    def visit_ConstantNode(self, node: ConstantNode, context: Context) -> RTResult[Value]:
+        return RTResult[Value]().success(node.value)
+
+    def visit_BlockNode(self, node: BlockNode, context: Context) -> RTResult[Value]:
+        res = RTResult[Value]()
+        value: Optional[Value] = None
+
+        for statement in node.statements:
+            value = res.register(self.visit(statement, context))
+            if res.should_return():
+                return res
+
+        if value is None:
+            value = Null.null()
+        return res.success(value)
+
     def visit_VarAccessNode(self, node: VarAccessNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
         var_name = node.var_name_tok.value
         assert isinstance(var_name, str), "This could be a bug in the lexer"
         assert context.symbol_table is not None
-        value = context.symbol_table.get(var_name)
+        value = context.symbol_table.lookup(var_name, node.depth)
 
         if value is None:
             return res.failure(RNNameError(node.pos_start, node.pos_end, f"'{var_name}' is not defined", context))
 
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        assert value is not None
+        # Values are shared, not copied or relocated: errors are placed at the nodes using them (see `located_error`)
         return res.success(value)
 
     def visit_VarAssignNode(self, node: VarAssignNode, context: Context) -> RTResult[Value]:
@@ -296,6 +452,7 @@ class Interpreter:
             context=context,
             extra_names=node.extra_names,
             qualifier=node.qualifier,
+            depth=node.depth,
             pos_start=node.pos_start,
             pos_end=node.pos_end,
         )
@@ -330,14 +487,13 @@ class Interpreter:
         if res.should_return():
             return res
         assert func is not None
-        func = func.copy().set_pos(node.pos_start, node.pos_end)
 
         if isinstance(func, BaseFunction):
             errtype = func.name
         else:
             errtype = repr(func)
 
-        msg_val = res.register(func.execute([], {}))
+        msg_val = res.register(func.call([], {}, node.pos_start, node.pos_end, context))
         if res.should_return():
             return res
         assert msg_val is not None
@@ -422,51 +578,36 @@ class Interpreter:
         if res.should_return():
             return res
         assert left is not None
+
+        operation = node.operation
+        if operation is None:
+            operation = node.operation = binary_operation(node.op_tok)
+
+        if operation.short_circuit is not None:
+            decided = operation.short_circuit(left)
+            if decided is not None:
+                return res.success(decided)
+
         right = res.register(self.visit(node.right_node, context))
         if res.should_return():
             return res
         assert right is not None
 
-        if node.op_tok.type == TT_PLUS:
-            result, error = left.added_to(right)
-        elif node.op_tok.type == TT_MINUS:
-            result, error = left.subbed_by(right)
-        elif node.op_tok.type == TT_MUL:
-            result, error = left.multed_by(right)
-        elif node.op_tok.type == TT_DIV:
-            result, error = left.dived_by(right)
-        elif node.op_tok.type == TT_POW:
-            result, error = left.powed_by(right)
-        elif node.op_tok.type == TT_MOD:
-            result, error = left.modded_by(right)
-        elif node.op_tok.type == TT_EE:
-            result, error = left.get_comparison_eq(right)
-        elif node.op_tok.type == TT_NE:
-            result, error = left.get_comparison_ne(right)
-        elif node.op_tok.type == TT_LT:
-            result, error = left.get_comparison_lt(right)
-        elif node.op_tok.type == TT_GT:
-            result, error = left.get_comparison_gt(right)
-        elif node.op_tok.type == TT_LTE:
-            result, error = left.get_comparison_lte(right)
-        elif node.op_tok.type == TT_GTE:
-            result, error = left.get_comparison_gte(right)
-        elif node.op_tok.matches(TT_KEYWORD, "and"):
-            result, error = left.anded_by(right)
-        elif node.op_tok.matches(TT_KEYWORD, "or"):
-            result, error = left.ored_by(right)
-        elif node.op_tok.type == TT_IDIV:
-            result, error = left.idived_by(right)
-        elif node.op_tok.matches(TT_KEYWORD, "in"):
-            result, error = right.contains(left)
-        else:
-            assert False, f"invalid binary operation: {node.op_tok}, this is probably a bug in the parser."
+        if operation.number is not None and type(left) is Number and type(right) is Number:
+            function, result_type = operation.number
+            try:
+                value = function(left.value, right.value)
+            except ZeroDivisionError:
+                pass
+            else:
+                return res.success(result_type.of(value))
 
+        result, error = operation.generic(left, right)
         if error:
-            return res.failure(error)
+            return res.failure(located_error(error, (left, right), node.pos_start, node.pos_end, context))
         else:
             assert result is not None
-            return res.success(result.set_pos(node.pos_start, node.pos_end))
+            return res.success(result)
 
     def visit_UnaryOpNode(self, node: UnaryOpNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
@@ -478,30 +619,30 @@ class Interpreter:
         error = None
 
         if node.op_tok.type == TT_MINUS:
-            number, error = number.multed_by(Number(-1))
+            result, error = number.multed_by(Number(-1))
         elif node.op_tok.matches(TT_KEYWORD, "not"):
-            number, error = number.notted()
+            result, error = number.notted()
         else:
             assert False, f"invalid unary operation: {node.op_tok}, this is probably a bug in the parser."
 
         if error:
             assert error is not None
-            return res.failure(error)
+            return res.failure(located_error(error, (number,), node.pos_start, node.pos_end, context))
         else:
-            assert number is not None
-            return res.success(number.set_pos(node.pos_start, node.pos_end))
+            assert result is not None
+            return res.success(result)
 
     def visit_IfNode(self, node: IfNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
 
-        for condition, expr, should_return_null in node.cases:
+        for (condition, expr, should_return_null), scoped in zip(node.cases, node.case_scopes):
             condition_value = res.register(self.visit(condition, context))
             if res.should_return():
                 return res
             assert condition_value is not None
 
             if condition_value.is_true():
-                expr_value = res.register(self.visit_block(expr, context))
+                expr_value = res.register(self.visit_block(expr, context, scoped))
                 if res.should_return():
                     return res
                 assert expr_value is not None
@@ -509,7 +650,7 @@ class Interpreter:
 
         if node.else_case is not None:
             expr, should_return_null = node.else_case
-            expr_value = res.register(self.visit_block(expr, context))
+            expr_value = res.register(self.visit_block(expr, context, node.else_scope))
             if res.should_return():
                 return res
             assert expr_value is not None
@@ -519,7 +660,8 @@ class Interpreter:
 
     def visit_ForNode(self, node: ForNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
-        elements: list[Value] = []
+        # The values of the body are only collected when the loop is used as an expression
+        elements: Optional[list[Value]] = None if node.should_return_null else []
 
         start_value = res.register(self.visit(node.start_value_node, context))
         if res.should_return():
@@ -577,7 +719,7 @@ class Interpreter:
             context.symbol_table.set(node.var_name_tok.value, Number(i))
             i += step_value.value
 
-            value = res.register(self.visit_block(node.body_node, context))
+            value = res.register(self.visit_block(node.body_node, context, node.body_scope))
             if res.should_return() and not res.loop_should_continue and not res.loop_should_break:
                 return res
 
@@ -587,18 +729,18 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            assert value is not None
-            elements.append(value)
+            if elements is not None:
+                assert value is not None
+                elements.append(value)
 
-        return res.success(
-            Null.null()
-            if node.should_return_null
-            else Array(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        if elements is None:
+            return res.success(Null.null())
+        return res.success(Array(elements).set_context(context).set_pos(node.pos_start, node.pos_end))
 
     def visit_WhileNode(self, node: WhileNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
-        elements: list[Value] = []
+        # The values of the body are only collected when the loop is used as an expression
+        elements: Optional[list[Value]] = None if node.should_return_null else []
 
         while True:
             condition = res.register(self.visit(node.condition_node, context))
@@ -609,7 +751,7 @@ class Interpreter:
             if not condition.is_true():
                 break
 
-            value = res.register(self.visit_block(node.body_node, context))
+            value = res.register(self.visit_block(node.body_node, context, node.body_scope))
             if res.should_return() and not res.loop_should_continue and not res.loop_should_break:
                 return res
 
@@ -619,14 +761,13 @@ class Interpreter:
             if res.loop_should_break:
                 break
 
-            assert value is not None
-            elements.append(value)
+            if elements is not None:
+                assert value is not None
+                elements.append(value)
 
-        return res.success(
-            Null.null()
-            if node.should_return_null
-            else Array(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        if elements is None:
+            return res.success(Null.null())
+        return res.success(Array(elements).set_context(context).set_pos(node.pos_start, node.pos_end))
 
     def visit_FuncDefNode(self, node: FuncDefNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
@@ -679,14 +820,22 @@ class Interpreter:
         if res.should_return():
             return res
         assert value_to_call is not None
-        value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
 
         return self.call_value(value_to_call, node, context)
 
     def visit_ReturnNode(self, node: ReturnNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
 
-        if node.node_to_return:
+        if node.tail_call:
+            assert isinstance(node.node_to_return, CallNode)
+            value_to_call = res.register(self.visit(node.node_to_return.node_to_call, context))
+            if res.should_return():
+                return res
+            assert value_to_call is not None
+            value = res.register(self.call_value(value_to_call, node.node_to_return, context, tail_call=True))
+            if res.should_return():
+                return res
+        elif node.node_to_return:
             value = res.register(self.visit(node.node_to_return, context))
             if res.should_return():
                 return res
@@ -741,9 +890,12 @@ class Interpreter:
         assert iterable is not None
         it = iterable.iter()
 
-        elements: list[Value] = []
+        elements: Optional[list[Value]] = None if should_return_null else []
 
         for it_res in it:
+            if it_res.error is not None:
+                pos_start, pos_end = node.iterable_node.pos_start, node.iterable_node.pos_end
+                return res.failure(located_error(it_res.error, (iterable,), pos_start, pos_end, context))
             element = res.register(it_res)
             if res.should_return():
                 return res
@@ -761,10 +913,11 @@ class Interpreter:
 
             if res.loop_should_continue:
                 continue
-            assert value is not None
-            elements.append(value)
+            if elements is not None:
+                assert value is not None
+                elements.append(value)
 
-        if should_return_null:
+        if elements is None:
             return res.success(Null.null())
         return res.success(Array(elements).set_context(context).set_pos(node.pos_start, node.pos_end))
 
@@ -796,9 +949,9 @@ class Interpreter:
         result, error = indexee.get_slice(index_start, index_end, index_step)
 
         if error is not None:
-            return res.failure(error)
+            return res.failure(located_error(error, (indexee,), node.pos_start, node.pos_end, context))
         assert result is not None
-        return res.success(result.set_pos(node.pos_start, node.pos_end).set_context(context))
+        return res.success(result)
 
     def visit_IndexGetNode(self, node: IndexGetNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
@@ -814,7 +967,7 @@ class Interpreter:
 
         result, error = indexee.get_index(index)
         if error is not None:
-            return res.failure(error)
+            return res.failure(located_error(error, (indexee, index), node.pos_start, node.pos_end, context))
         assert result is not None
 
         return res.success(result)
@@ -838,33 +991,31 @@ class Interpreter:
 
         result, error = indexee.set_index(index, value)
         if error:
-            return res.failure(error)
+            return res.failure(located_error(error, (indexee, index, value), node.pos_start, node.pos_end, context))
         assert result is not None
 
         return res.success(result)
 
     def visit_HashMapNode(self, node: HashMapNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
-        values: dict[str, Value] = {}
+        hashmap = HashMap({})
 
         for key_node, value_node in node.pairs:
             key = res.register(self.visit(key_node, context))
             if res.should_return():
                 return res
-
-            if not isinstance(key, String):
-                return res.failure(
-                    RTError(key_node.pos_start, key_node.pos_end, f"Non-string key for hashmap: '{key!r}'", context)
-                )
+            assert key is not None
 
             value = res.register(self.visit(value_node, context))
             if res.should_return():
                 return res
             assert value is not None
 
-            values[key.value] = value
+            error = hashmap.set(key, value)
+            if error is not None:
+                return res.failure(located_error(error, (key,), key_node.pos_start, key_node.pos_end, context))
 
-        return res.success(HashMap(values))
+        return res.success(hashmap.set_context(context).set_pos(node.pos_start, node.pos_end))
 
     def visit_ClassNode(self, node: ClassNode, context: Context) -> RTResult[Value]:
         res = RTResult[Value]()
@@ -911,13 +1062,13 @@ class Interpreter:
         assert isinstance(var_name, str), "This could be a bug in the lexer"
         pre = node.is_pre
 
-        old_value = context.symbol_table.get(var_name)
+        old_value = context.symbol_table.lookup(var_name, node.depth)
         if old_value is None:
             return res.failure(RNNameError(node.pos_start, node.pos_end, f"'{var_name}' is not defined", context))
 
         new_value, error = old_value.added_to(Number.one())
         if error is not None:
-            return res.failure(error)
+            return res.failure(located_error(error, (old_value,), node.pos_start, node.pos_end, context))
         assert new_value is not None
 
         res.register(
@@ -927,6 +1078,7 @@ class Interpreter:
                 context=context,
                 extra_names=node.extra_names,
                 qualifier=node.qualifier,
+                depth=node.depth,
                 pos_start=node.pos_start,
                 pos_end=node.pos_end,
             )
@@ -942,13 +1094,13 @@ class Interpreter:
         assert isinstance(var_name, str), "This could be a bug in the lexer"
         pre = node.is_pre
 
-        old_value = context.symbol_table.get(var_name)
+        old_value = context.symbol_table.lookup(var_name, node.depth)
         if old_value is None:
             return res.failure(RNNameError(node.pos_start, node.pos_end, f"'{var_name}' is not defined", context))
 
         new_value, error = old_value.subbed_by(Number.one())
         if error is not None:
-            return res.failure(error)
+            return res.failure(located_error(error, (old_value,), node.pos_start, node.pos_end, context))
         assert new_value is not None
 
         res.register(
@@ -958,6 +1110,7 @@ class Interpreter:
                 context=context,
                 extra_names=node.extra_names,
                 qualifier=node.qualifier,
+                depth=node.depth,
                 pos_start=node.pos_start,
                 pos_end=node.pos_end,
             )
@@ -984,7 +1137,7 @@ class Interpreter:
                 assert value is not None
                 bool_, error = subject.get_comparison_eq(value)
                 if error is not None:
-                    return res.failure(error)
+                    return res.failure(located_error(error, (subject, value), expr.pos_start, expr.pos_end, context))
                 assert bool_ is not None
                 should_continue = bool(bool_.is_true())
 
@@ -1039,20 +1192,19 @@ class Interpreter:
 
         attr_name = node.attr_name_tok.value
         assert isinstance(attr_name, str), "This could be a bug in the lexer"
+        if node.cache is None:
+            node.cache = AttributeCache(attr_name)
         orig_value = value
-        value = value.symbol_table.get(attr_name)
+        value = node.cache.get(value)
         if value is None:
             return res.failure(
                 RTError(node.pos_start, node.pos_end, f"Attribute '{attr_name}' does not exist", context)
             )
 
         if isinstance(orig_value, BaseInstance) and isinstance(value, BaseFunction):
-            value = res.register(orig_value.bind_method(value))
+            value = res.register(orig_value.get_bound_method(attr_name, value))
             if res.should_return():
                 return res
-        else:
-            value = value.copy()
         assert value is not None
-        value.set_pos(node.pos_start, node.pos_end).set_context(context)
 
         return res.success(value)
@@ -177,15 +177,16 @@ class Lexer:
         self.advance()
 
         while self.current_char is not None and (self.current_char != '"' or escape_character):
-            if self.current_char == "\\":
-                escape_character = True
-            else:
-                escape_character = False
+            # `\\` is an escaped backslash, it doesn't escape the following character
+            escape_character = self.current_char == "\\" and not escape_character
             string += self.current_char
             self.advance()
 
         self.advance()
-        return Token(TT_STRING, string.encode("utf-8").decode("unicode-escape"), pos_start=pos_start, pos_end=self.pos)
+        if "\\" in string:
+            # Only the escape sequences are decoded, other characters are kept as they are ("é" stays "é")
+            string = string.encode("latin-1", "backslashreplace").decode("unicode-escape")
+        return Token(TT_STRING, string, pos_start=pos_start, pos_end=self.pos)
 
     def make_identifier(self) -> Token:
         id_str = ""
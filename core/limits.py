@@ -0,0 +1,65 @@
+"""Runtime limits
+
+Every Radon call runs many Python frames (`visit` -> `visit_CallNode` -> `call_value` -> `Function.call` ->
+`visit` -> ...), so deep Radon recursion used to crash the interpreter with Python's own `RecursionError`. Radon
+calls are counted instead: once `max_depth` calls are running, `Function.call` fails with a Radon
+`RecursionError`, reported with its traceback and catchable by `try`. Python's recursion limit is raised to fit
+`max_depth` calls by `fit_recursion_limit` when a program is run (not when `core` is imported, since the limit is
+process-wide).
+
+Python frames don't use the C stack since Python 3.11, but calls going through C code still do: `run_with_stack_size`
+runs the interpreter on a thread with a larger C stack for very deep recursion.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_DEPTH = 1000
+# Python frames run by a single Radon call, with room for deeply nested expressions
+PYTHON_FRAMES_PER_CALL = 50
+
+# Most Radon calls allowed to run at once
+max_depth: int = DEFAULT_MAX_DEPTH
+# Radon calls currently running (tail calls replace the call making them, see `Function.call`)
+depth: int = 0
+
+
+def set_max_depth(limit: int) -> None:
+    global max_depth
+    if limit < 1:
+        raise ValueError(f"Invalid maximum call depth {limit} (must be at least 1)")
+    max_depth = limit
+
+
+def fit_recursion_limit() -> None:
+    """Raise Python's recursion limit so `max_depth` Radon calls can run"""
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), max_depth * PYTHON_FRAMES_PER_CALL))
+
+
+def run_with_stack_size(function: Callable[[], T], stack_size: int) -> T:
+    """Call a function on a new thread whose C stack is `stack_size` bytes, re-raising its exceptions"""
+    results: list[T] = []
+    exceptions: list[BaseException] = []
+
+    def target() -> None:
+        try:
+            results.append(function())
+        except BaseException as e:
+            exceptions.append(e)
+
+    previous_stack_size = threading.stack_size(stack_size)
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+    finally:
+        threading.stack_size(previous_stack_size)
+    thread.join()
+
+    if len(exceptions) > 0:
+        raise exceptions[0]
+    return results[0]
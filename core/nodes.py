@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Optional, Protocol, TypeAlias, runtime_checkable
+from typing import TYPE_CHECKING, Iterator, Optional, Protocol, TypeAlias, TypeGuard, runtime_checkable
 
 if TYPE_CHECKING:
+    from core.datatypes import AttributeCache, Value
+    from core.interpreter import Operation
     from core.tokens import Position, Token
 
 
@@ -18,7 +20,38 @@ class Node(Protocol):
     def pos_end(self) -> Position: ...
 
 
+def iter_fields(node: Node) -> Iterator[tuple[str, object]]:
+    """Yield the name and value of every attribute of a node (nodes are slotted, they have no `__dict__`)"""
+    names: tuple[str, ...] = getattr(type(node), "__slots__")
+    for name in names:
+        yield name, getattr(node, name)
+
+
+def iter_child_nodes(node: Node) -> Iterator[Node]:
+    """Yield the direct children of a node"""
+    for _, value in iter_fields(node):
+        yield from iter_nodes(value)
+
+
+def iter_nodes(value: object) -> Iterator[Node]:
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            yield from iter_nodes(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from iter_nodes(item)
+    elif is_ast_node(value):
+        yield value
+
+
+def is_ast_node(value: object) -> TypeGuard[Node]:
+    # Tokens and values held by nodes also have positions, but are not part of the tree
+    return isinstance(value, Node) and type(value).__module__ == __name__
+
+
 class NullNode:
+    __slots__ = ("pos_start", "pos_end")
+
     pos_start: Optional[Position]
     pos_end: Optional[Position]
 
@@ -28,13 +61,18 @@ class NullNode:
 
 
 class NumberNode:
+    __slots__ = ("tok", "value", "pos_start", "pos_end")
+
     tok: Token
+    # Runtime value of the literal, built once by the parser and shared by every evaluation
+    value: Value
 
     pos_start: Position
     pos_end: Position
 
-    def __init__(self, tok: Token) -> None:
+    def __init__(self, tok: Token, value: Value) -> None:
         self.tok = tok
+        self.value = value
 
         self.pos_start = self.tok.pos_start
         self.pos_end = self.tok.pos_end
@@ -44,13 +82,18 @@ class NumberNode:
 
 
 class StringNode:
+    __slots__ = ("tok", "value", "pos_start", "pos_end")
+
     tok: Token
+    # Runtime value of the literal, built once by the parser and shared by every evaluation
+    value: Value
 
     pos_start: Position
     pos_end: Position
 
-    def __init__(self, tok: Token) -> None:
+    def __init__(self, tok: Token, value: Value) -> None:
         self.tok = tok
+        self.value = value
 
         self.pos_start = self.tok.pos_start
         self.pos_end = self.tok.pos_end
@@ -60,6 +103,8 @@ class StringNode:
 
 
 class ArrayNode:
+    __slots__ = ("element_nodes", "pos_start", "pos_end")
+
     element_nodes: list[Node]
 
     pos_start: Position
@@ -72,24 +117,70 @@ class ArrayNode:
         self.pos_end = pos_end
 
 
+class ConstantNode:
+    """A value computed before execution (see `core.optimizer`), shared by every evaluation"""
+
+    __slots__ = ("value", "pos_start", "pos_end")
+
+    value: Value
+
+    pos_start: Position
+    pos_end: Position
+
+    def __init__(self, value: Value, pos_start: Position, pos_end: Position) -> None:
+        self.value = value
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+    def __repr__(self) -> str:
+        return f"{self.value!r}"
+
+
+class BlockNode:
+    """A list of statements, its value is the value of the last statement (null if empty)"""
+
+    __slots__ = ("statements", "pos_start", "pos_end")
+
+    statements: list[Node]
+
+    pos_start: Position
+    pos_end: Position
+
+    def __init__(self, statements: list[Node], pos_start: Position, pos_end: Position) -> None:
+        self.statements = statements
+
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+
 class VarAccessNode:
+    __slots__ = ("var_name_tok", "depth", "pos_start", "pos_end")
+
     var_name_tok: Token
+    # Number of scopes up to the one declaring the variable, set by `core.resolver` (None: unknown)
+    depth: Optional[int]
 
     pos_start: Position
     pos_end: Position
 
     def __init__(self, var_name_tok: Token) -> None:
         self.var_name_tok = var_name_tok
+        self.depth = None
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.var_name_tok.pos_end
 
 
 class VarAssignNode:
+    __slots__ = ("var_name_tok", "value_node", "extra_names", "qualifier", "depth", "pos_start", "pos_end")
+
     var_name_tok: Token
     value_node: Node
     extra_names: list[Token]
     qualifier: Optional[Token]
+    # Number of scopes up to the one declaring the variable, set by `core.resolver` (None: unknown)
+    depth: Optional[int]
 
     pos_start: Position
     pos_end: Position
@@ -101,6 +192,7 @@ class VarAssignNode:
         self.value_node = value_node
         self.extra_names = extra_names
         self.qualifier = qualifier
+        self.depth = None
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = (
@@ -110,7 +202,7 @@ class VarAssignNode:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class FromImportNode:
     module: Token
     names: list[tuple[str, Token]]
@@ -120,7 +212,7 @@ class FromImportNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class ImportNode:
     module: Token
     name: Optional[Token]
@@ -130,14 +222,14 @@ class ImportNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class RaiseNode:
     call: CallNode
     pos_start: Position
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class UnitRaiseNode:
     func: Node
     pos_start: Position
@@ -145,9 +237,13 @@ class UnitRaiseNode:
 
 
 class BinOpNode:
+    __slots__ = ("left_node", "op_tok", "right_node", "operation", "pos_start", "pos_end")
+
     left_node: Node
     op_tok: Token
     right_node: Node
+    # Implementation of the operator, looked up on first evaluation (see `core.interpreter.binary_operation`)
+    operation: Optional[Operation]
 
     pos_start: Position
     pos_end: Position
@@ -156,6 +252,7 @@ class BinOpNode:
         self.left_node = left_node
         self.op_tok = op_tok
         self.right_node = right_node
+        self.operation = None
 
         self.pos_start = self.left_node.pos_start
         self.pos_end = self.right_node.pos_end
@@ -165,6 +262,8 @@ class BinOpNode:
 
 
 class UnaryOpNode:
+    __slots__ = ("op_tok", "node", "pos_start", "pos_end")
+
     op_tok: Token
     node: Node
 
@@ -186,8 +285,13 @@ Case: TypeAlias = tuple[Node, Node, bool]
 
 
 class IfNode:
+    __slots__ = ("cases", "else_case", "case_scopes", "else_scope", "pos_start", "pos_end")
+
     cases: list[Case]
     else_case: Optional[tuple[Node, bool]]
+    # Whether each case body (and the else body) needs its own scope, see `core.resolver`
+    case_scopes: list[bool]
+    else_scope: bool
 
     pos_start: Position
     pos_end: Position
@@ -195,12 +299,26 @@ class IfNode:
     def __init__(self, cases: list[Case], else_case: Optional[tuple[Node, bool]]):
         self.cases = cases
         self.else_case = else_case
+        self.case_scopes = [True] * len(cases)
+        self.else_scope = True
 
         self.pos_start = self.cases[0][0].pos_start
         self.pos_end = (else_case or cases[len(self.cases) - 1])[0].pos_end
 
 
 class ForNode:
+    __slots__ = (
+        "var_name_tok",
+        "start_value_node",
+        "end_value_node",
+        "step_value_node",
+        "body_node",
+        "should_return_null",
+        "body_scope",
+        "pos_start",
+        "pos_end",
+    )
+
     var_name_tok: Token
     start_value_node: Node
     end_value_node: Node
@@ -208,6 +326,8 @@ class ForNode:
 
     body_node: Node
     should_return_null: bool
+    # Whether the body needs its own scope, see `core.resolver`
+    body_scope: bool
 
     pos_start: Position
     pos_end: Position
@@ -227,15 +347,20 @@ class ForNode:
         self.step_value_node = step_value_node
         self.body_node = body_node
         self.should_return_null = should_return_null
+        self.body_scope = True
 
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.body_node.pos_end
 
 
 class WhileNode:
+    __slots__ = ("condition_node", "body_node", "should_return_null", "body_scope", "pos_start", "pos_end")
+
     condition_node: Node
     body_node: Node
     should_return_null: bool
+    # Whether the body needs its own scope, see `core.resolver`
+    body_scope: bool
 
     pos_start: Position
     pos_end: Position
@@ -244,12 +369,13 @@ class WhileNode:
         self.condition_node = condition_node
         self.body_node = body_node
         self.should_return_null = should_return_null
+        self.body_scope = True
 
         self.pos_start = self.condition_node.pos_start
         self.pos_end = self.body_node.pos_end
 
 
-@dataclass
+@dataclass(slots=True)
 class FuncDefNode:
     var_name_tok: Optional[Token]
     arg_name_toks: list[Token]
@@ -266,6 +392,8 @@ class FuncDefNode:
 
 
 class CallNode:
+    __slots__ = ("node_to_call", "arg_nodes", "kwarg_nodes", "pos_start", "pos_end")
+
     node_to_call: Node
     arg_nodes: list[Node]
     kwarg_nodes: dict[str, Node]
@@ -286,39 +414,42 @@ class CallNode:
             self.pos_end = self.node_to_call.pos_end
 
 
-@dataclass
+@dataclass(slots=True)
 class ReturnNode:
     node_to_return: Optional[Node]
 
     pos_start: Position
     pos_end: Position
 
+    # Whether `node_to_return` is a call made in place of the function returning (see `core.resolver`)
+    tail_call: bool = False
+
 
-@dataclass
+@dataclass(slots=True)
 class ContinueNode:
     pos_start: Position
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class BreakNode:
     pos_start: Position
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class FallthroughNode:
     pos_start: Position
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class FalloutNode:
     pos_start: Position
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class TryNode:
     try_block: Node
     exc_iden: Token
@@ -328,7 +459,7 @@ class TryNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class ForInNode:
     var_name_tok: Token
     iterable_node: Node
@@ -340,7 +471,7 @@ class ForInNode:
     should_return_null: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexGetNode:
     pos_start: Position
     pos_end: Position
@@ -349,7 +480,7 @@ class IndexGetNode:
     index: Node
 
 
-@dataclass
+@dataclass(slots=True)
 class SliceGetNode:
     pos_start: Position
     pos_end: Position
@@ -360,7 +491,7 @@ class SliceGetNode:
     index_step: Optional[Node] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class IndexSetNode:
     indexee: Node
     index: Node
@@ -370,7 +501,7 @@ class IndexSetNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class HashMapNode:
     pairs: list[tuple[Node, Node]]
 
@@ -378,7 +509,7 @@ class HashMapNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassNode:
     class_name_tok: Token
     desc: str
@@ -388,7 +519,7 @@ class ClassNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class AssertNode:
     condition: Node
     message: Optional[Node]
@@ -397,7 +528,7 @@ class AssertNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class IncNode:
     var_name_tok: Token
     extra_names: list[Token]
@@ -407,8 +538,11 @@ class IncNode:
     pos_start: Position
     pos_end: Position
 
+    # Number of scopes up to the one declaring the variable, set by `core.resolver` (None: unknown)
+    depth: Optional[int] = None
 
-@dataclass
+
+@dataclass(slots=True)
 class DecNode:
     var_name_tok: Token
     extra_names: list[Token]
@@ -418,8 +552,11 @@ class DecNode:
     pos_start: Position
     pos_end: Position
 
+    # Number of scopes up to the one declaring the variable, set by `core.resolver` (None: unknown)
+    depth: Optional[int] = None
+
 
-@dataclass
+@dataclass(slots=True)
 class SwitchNode:
     subject_node: Node
     cases: list[tuple[Node, Node]]
@@ -429,10 +566,13 @@ class SwitchNode:
     pos_end: Position
 
 
-@dataclass
+@dataclass(slots=True)
 class AttrAccessNode:
     node_to_access: Node
     attr_name_tok: Token
 
     pos_start: Position
     pos_end: Position
+
+    # Set by the engines when the node is first executed
+    cache: Optional[AttributeCache] = None
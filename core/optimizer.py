@@ -0,0 +1,249 @@
+"""AST optimizer
+
+`optimize` rewrites a freshly parsed AST before it is resolved and executed. Optimization levels:
+
+    0  - no optimization
+    1  - constant folding (default):
+           - arithmetic, string concatenation and comparisons whose operands are literals are computed once
+           - `if` branches with constant conditions are removed (or become the `else` branch)
+           - `const` declarations of the program whose values are literals are propagated to the uses following them
+
+Folded expressions become `ConstantNode`s. Operations failing (like a division by zero) are left untouched so the
+error is raised at runtime, as without optimization. So are operations whose results would be too large to keep in the
+AST (huge integers, long strings), which are checked before being computed.
+
+A `const` is only propagated when it is declared at the top level of the program and its name is never declared or
+assigned anywhere else in the program, so every use following the declaration refers to it.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Callable, Optional
+
+from core.datatypes import Boolean, Null, Number, String, Value
+from core.nodes import (
+    BinOpNode,
+    BlockNode,
+    ClassNode,
+    ConstantNode,
+    DecNode,
+    ForInNode,
+    ForNode,
+    FromImportNode,
+    FuncDefNode,
+    IfNode,
+    ImportNode,
+    IncNode,
+    Node,
+    NumberNode,
+    StringNode,
+    TryNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    is_ast_node,
+    iter_child_nodes,
+    iter_fields,
+)
+from core.tokens import TT_KEYWORD, TT_MINUS, TT_MUL, TT_POW, TokenType
+
+OPTIMIZATION_LEVELS = [0, 1]
+
+# Optimization level used for programs and modules
+optimization_level: int = 1
+
+# Longest string produced by folding, to keep the AST small (`"-" * 1000000` is left to the runtime)
+MAX_FOLDED_STRING_LENGTH = 4096
+
+# Size of the largest integer produced by folding, in bits (`10 ^ 10000000` is left to the runtime)
+MAX_FOLDED_INT_BITS = 4096
+
+
+def set_optimization_level(level: int) -> None:
+    global optimization_level
+    if level not in OPTIMIZATION_LEVELS:
+        raise ValueError(f"Unknown optimization level {level} (available levels: 0, 1)")
+    optimization_level = level
+
+
+def constant_value(node: Node) -> Optional[Value]:
+    """The value of a node if it is known before execution"""
+    if isinstance(node, ConstantNode):
+        return node.value
+    if isinstance(node, NumberNode | StringNode):
+        return node.value
+    return None
+
+
+def is_small_enough(op: TokenType, left: Value, right: Value) -> bool:
+    """Whether the result of an operation is known to be small before computing it"""
+    if op == TT_POW and isinstance(left, Number) and isinstance(right, Number):
+        if isinstance(left.value, int) and isinstance(right.value, int) and right.value > 0:
+            return left.value.bit_length() * right.value <= MAX_FOLDED_INT_BITS
+    elif op == TT_MUL and isinstance(left, Number) and isinstance(right, Number):
+        if isinstance(left.value, int) and isinstance(right.value, int):
+            return left.value.bit_length() + right.value.bit_length() <= MAX_FOLDED_INT_BITS
+    elif op == TT_MUL and isinstance(left, String) and isinstance(right, Number):
+        return len(left.value) * right.value <= MAX_FOLDED_STRING_LENGTH
+    return True
+
+
+def is_foldable(value: Optional[Value]) -> bool:
+    if isinstance(value, String):
+        return len(value.value) <= MAX_FOLDED_STRING_LENGTH
+    return isinstance(value, Number | Boolean)
+
+
+def assigned_names(node: Node) -> Counter[str]:
+    """Count the declarations and assignments of every name in a program"""
+    names: Counter[str] = Counter()
+
+    def add(name: object) -> None:
+        if isinstance(name, str):
+            names[name] += 1
+
+    stack = [node]
+    while len(stack) > 0:
+        node = stack.pop()
+        if isinstance(node, VarAssignNode) and node.extra_names == []:
+            add(node.var_name_tok.value)
+        elif isinstance(node, IncNode | DecNode | ForNode | ForInNode):
+            add(node.var_name_tok.value)
+        elif isinstance(node, TryNode):
+            add(node.exc_iden.value)
+        elif isinstance(node, FuncDefNode):
+            if node.var_name_tok is not None:
+                add(node.var_name_tok.value)
+            for arg_name in node.arg_name_toks:
+                add(arg_name.value)
+            add(node.va_name)
+        elif isinstance(node, ClassNode):
+            add(node.class_name_tok.value)
+        elif isinstance(node, ImportNode):
+            add(node.name.value if node.name is not None else node.module.value)
+        elif isinstance(node, FromImportNode):
+            for _, name_tok in node.names:
+                add(name_tok.value)
+        stack.extend(iter_child_nodes(node))
+    return names
+
+
+class Optimizer:
+    # Names declared and assigned only once in the program, by a top-level `const`
+    propagatable: set[str]
+    constants: dict[str, Value]
+
+    def __init__(self) -> None:
+        self.propagatable = set()
+        self.constants = {}
+
+    def optimize(self, node: Node) -> Node:
+        self.propagatable = {name for name, count in assigned_names(node).items() if count == 1}
+        if not isinstance(node, BlockNode):
+            return self.visit(node)
+
+        for i, statement in enumerate(node.statements):
+            statement = node.statements[i] = self.visit(statement)
+            if isinstance(statement, VarAssignNode) and statement.qualifier is not None:
+                name = statement.var_name_tok.value
+                value = constant_value(statement.value_node)
+                if statement.qualifier.value == "const" and name in self.propagatable and value is not None:
+                    assert isinstance(name, str)
+                    self.constants[name] = value
+        return node
+
+    def visit(self, node: Node) -> Node:
+        method: Callable[[Node], Node] = getattr(self, f"visit_{type(node).__name__}", self.visit_children)
+        return method(node)
+
+    def visit_children(self, node: Node) -> Node:
+        for name, value in list(iter_fields(node)):
+            setattr(node, name, self.transform(value))
+        return node
+
+    def transform(self, value: object) -> object:
+        if isinstance(value, list):
+            return [self.transform(item) for item in value]
+        if isinstance(value, tuple):
+            return tuple(self.transform(item) for item in value)
+        if isinstance(value, dict):
+            return {key: self.transform(item) for key, item in value.items()}
+        if is_ast_node(value):
+            return self.visit(value)
+        return value
+
+    ###################################
+
+    def visit_VarAccessNode(self, node: VarAccessNode) -> Node:
+        value = self.constants.get(str(node.var_name_tok.value))
+        if value is None:
+            return node
+        return ConstantNode(value, node.pos_start, node.pos_end)
+
+    def visit_BinOpNode(self, node: BinOpNode) -> Node:
+        from core.interpreter import BINARY_OPERATIONS  # Lazy import
+
+        node.left_node = self.visit(node.left_node)
+        node.right_node = self.visit(node.right_node)
+
+        # Keyword operations (`and`, `or`, `in`, ...) are left to the runtime
+        operation = BINARY_OPERATIONS.get(node.op_tok.type)
+        left, right = constant_value(node.left_node), constant_value(node.right_node)
+        if operation is None or left is None or right is None:
+            return node
+        if not is_small_enough(node.op_tok.type, left, right):
+            return node
+
+        try:
+            result, error = operation(left, right)
+        except (ArithmeticError, ValueError):
+            return node
+        if error is not None or not is_foldable(result):
+            return node
+        assert result is not None
+        return ConstantNode(result, node.pos_start, node.pos_end)
+
+    def visit_UnaryOpNode(self, node: UnaryOpNode) -> Node:
+        node.node = self.visit(node.node)
+
+        operand = constant_value(node.node)
+        if operand is None:
+            return node
+
+        if node.op_tok.type == TT_MINUS:
+            result, error = operand.multed_by(Number(-1))
+        elif node.op_tok.matches(TT_KEYWORD, "not"):
+            result, error = operand.notted()
+        else:
+            return node
+        if error is not None or not is_foldable(result):
+            return node
+        assert result is not None
+        return ConstantNode(result, node.pos_start, node.pos_end)
+
+    def visit_IfNode(self, node: IfNode) -> Node:
+        self.visit_children(node)
+
+        cases = []
+        for condition, expr, should_return_null in node.cases:
+            value = constant_value(condition)
+            if value is None:
+                cases.append((condition, expr, should_return_null))
+            elif value.is_true():
+                # Always taken: the following cases are dead
+                node.else_case = (expr, should_return_null)
+                break
+
+        if len(cases) == 0 and node.else_case is None:
+            return ConstantNode(Null.null(), node.pos_start, node.pos_end)
+        node.cases = cases
+        node.case_scopes = [True] * len(cases)
+        return node
+
+
+def optimize(node: Node) -> Node:
+    """Optimize a program at the current optimization level"""
+    if optimization_level == 0:
+        return node
+    return Optimizer().optimize(node)
@@ -10,6 +10,7 @@ from core.nodes import (
     AssertNode,
     AttrAccessNode,
     BinOpNode,
+    BlockNode,
     BreakNode,
     CallNode,
     Case,
@@ -90,7 +91,7 @@ from core.tokens import (
 )
 
 if TYPE_CHECKING:
-    from core.datatypes import Boolean, Value
+    from core.datatypes import Boolean, Function, Value
 
 T = TypeVar("T")
 
@@ -204,7 +205,7 @@ class Parser:
             self.advance(res)
 
         if self.current_tok.type in (TT_EOF, TT_RBRACE):
-            return res.success(ArrayNode(list_statements, pos_start, self.current_tok.pos_end.copy()))
+            return res.success(BlockNode(list_statements, pos_start, self.current_tok.pos_end.copy()))
         statement = res.register(self.statement())
         if res.error:
             return res
@@ -232,7 +233,7 @@ class Parser:
             assert statement is not None
             list_statements.append(statement)
 
-        return res.success(ArrayNode(list_statements, pos_start, self.current_tok.pos_end.copy()))
+        return res.success(BlockNode(list_statements, pos_start, self.current_tok.pos_end.copy()))
 
     def statement(self) -> ParseResult[Node]:
         res = ParseResult[Node]()
@@ -594,8 +595,9 @@ class Parser:
             return res.make_unignorable()
         assert assign_expr is not None
 
+        # `+=` keeps its own operator, which adds in place (see `Value.added_in_place`)
         ASSIGN_TO_OPERATORS = {
-            TT_PE: TT_PLUS,
+            TT_PE: TT_PE,
             TT_ME: TT_MINUS,
             TT_TE: TT_MUL,
             TT_DE: TT_DIV,
@@ -774,12 +776,25 @@ class Parser:
         node: Optional[Node] = None
 
         if tok.type in (TT_INT, TT_FLOAT):
+            from core.datatypes import Number, is_interned
+
+            assert isinstance(tok.value, int | float), "This could be a bug in the lexer"
             self.advance(res)
-            node = NumberNode(tok)
+            number = Number.of(tok.value)
+            # An interned number is shared by every literal, only a fresh one carries the position of its literal
+            if not is_interned(number):
+                number.set_pos(tok.pos_start, tok.pos_end)
+            node = NumberNode(tok, number)
 
         elif tok.type == TT_STRING:
+            from core.datatypes import String, is_interned
+
+            assert isinstance(tok.value, str), "This could be a bug in the lexer"
             self.advance(res)
-            node = StringNode(tok)
+            string = String.of(tok.value)
+            if not is_interned(string):
+                string.set_pos(tok.pos_start, tok.pos_end)
+            node = StringNode(tok, string)
 
         elif tok.type == TT_IDENTIFIER:
             self.advance(res)
@@ -1724,6 +1739,9 @@ class RTResult(Generic[T]):
     value: Optional[T]
     error: Optional[RTError | Error]
     func_return_value: Optional[Value]
+    # Function, arguments and call site of a call in tail position, made by the function returning instead (see
+    # `Function.call`)
+    tail_call: Optional[tuple[Function, list[Value], dict[str, Value], Position, Position, Context]]
     loop_should_continue: bool
     loop_should_break: bool
     should_exit: bool
@@ -1737,6 +1755,7 @@ class RTResult(Generic[T]):
         self.value = None
         self.error = None
         self.func_return_value = None
+        self.tail_call = None
         self.loop_should_continue = False
         self.loop_should_break = False
         self.should_exit = False
@@ -1754,6 +1773,7 @@ class RTResult(Generic[T]):
         # print(f"{caller.f_code.co_filename}:{caller.f_lineno}: {res!r}")
         self.error = res.error
         self.func_return_value = res.func_return_value
+        self.tail_call = res.tail_call
         self.loop_should_continue = res.loop_should_continue
         self.loop_should_break = res.loop_should_break
         self.should_exit = res.should_exit
@@ -1773,6 +1793,19 @@ class RTResult(Generic[T]):
         self.func_return_value = value
         return self
 
+    def success_tail_call(
+        self,
+        function: Function,
+        args: list[Value],
+        kwargs: dict[str, Value],
+        pos_start: Position,
+        pos_end: Position,
+        context: Context,
+    ) -> RTResult[T]:
+        self.reset()
+        self.tail_call = (function, args, kwargs, pos_start, pos_end, context)
+        return self
+
     def success_continue(self) -> RTResult[T]:
         self.reset()
         self.loop_should_continue = True
@@ -1809,6 +1842,7 @@ class RTResult(Generic[T]):
         return bool(
             self.error is not None
             or self.func_return_value is not None
+            or self.tail_call is not None
             or self.loop_should_continue
             or self.loop_should_break
             or self.should_exit
@@ -1822,6 +1856,8 @@ class RTResult(Generic[T]):
             ret += f"error={repr(self.error)}"
         elif self.func_return_value is not None:
             ret += f"return={repr(self.func_return_value)}"
+        elif self.tail_call is not None:
+            ret += f"tail_call={repr(self.tail_call[0])}"
         elif self.loop_should_continue:
             ret += "continue"
         elif self.loop_should_break:
@@ -1846,22 +1882,46 @@ class SymbolTable:
     consts: set[str]
     statics: set[str]
     parent: Optional[SymbolTable]
+    # Incremented whenever a symbol is set or removed, so caches of lookups know when they are stale
+    version: int
 
     def __init__(self, parent: Optional[SymbolTable] = None) -> None:
         self.symbols = {}
         self.consts = set()
         self.statics = set()
         self.parent = parent
+        self.version = 0
 
     @property
     def is_global(self) -> bool:
         return self.parent is None
 
     def get(self, name: str) -> Optional[Value]:
-        value = self.symbols.get(name, None)
-        if value is None and self.parent:
-            return self.parent.get(name)
-        return value
+        table: Optional[SymbolTable] = self
+        while table is not None:
+            value = table.symbols.get(name, None)
+            if value is not None:
+                return value
+            table = table.parent
+        return None
+
+    def ancestor(self, depth: int) -> Optional[SymbolTable]:
+        table: Optional[SymbolTable] = self
+        for _ in range(depth):
+            if table is None:
+                break
+            table = table.parent
+        return table
+
+    def lookup(self, name: str, depth: Optional[int]) -> Optional[Value]:
+        """Same as `get`, but starts directly from the table declaring the variable when its depth is known"""
+        if depth is not None:
+            table = self.ancestor(depth)
+            if table is not None:
+                value = table.symbols.get(name, None)
+                if value is not None:
+                    return value
+        return self.get(name)
 
     def set(self, name: str, value: Value) -> RTResult[None]:
         if name in self.consts:
@@ -1869,9 +1929,18 @@ class SymbolTable:
                 RTError(value.pos_start, value.pos_end, f"Cannot reassign to constant {name}", value.context)
             )
         self.symbols[name] = value
+        self.version += 1
         return RTResult[None]().success(None)
 
-    def set_var(self, name: str, value: Value, qualifier: Optional[str] = None) -> RTResult[None]:
+    def set_var(
+        self, name: str, value: Value, qualifier: Optional[str] = None, depth: Optional[int] = None
+    ) -> RTResult[None]:
+        if qualifier is None and depth is not None:
+            # Skip the tables in between, which don't declare the variable (see `core.resolver`)
+            table = self.ancestor(depth)
+            if table is not None and name in table.symbols:
+                return table.set_var(name, value)
+
         if name in self.consts:
             return RTResult[None]().failure(
                 RTError(value.pos_start, value.pos_end, f"Cannot reassign to constant {name}", value.context)
@@ -1880,6 +1949,7 @@ class SymbolTable:
             case None:
                 if name in self.symbols:
                     self.symbols[name] = value
+                    self.version += 1
                 elif self.parent is not None:
                     self.parent.set_var(name, value, qualifier)
                 else:
@@ -1897,9 +1967,11 @@ class SymbolTable:
                         RTError(value.pos_start, value.pos_end, f"Cannot re-declare variable {name}", value.context)
                     )
                 self.symbols[name] = value
+                self.version += 1
             case "const":
                 self.symbols[name] = value
                 self.consts.add(name)
+                self.version += 1
             case _:
                 # Handle mypy checking only. No other reason.
                 pass
@@ -1920,9 +1992,10 @@ class SymbolTable:
         val = self.symbols.get(name, None)
         if val is not None:
             del self.symbols[name]
-            return res.success(Boolean(True))
+            self.version += 1
+            return res.success(Boolean.true())
         else:
-            return res.success(Boolean(False))
+            return res.success(Boolean.false())
 
 
 @dataclass
@@ -0,0 +1,213 @@
+"""Static scope resolution
+
+`resolve` walks a freshly parsed AST and annotates every variable access and assignment with the number of scopes
+between the node and the nearest scope declaring the variable (its `depth`). The scopes mirror the symbol tables
+created by the interpreter at runtime:
+
+    program   - the symbol table of the program (or module)
+    function  - created on every call, its parent is the scope the function was defined in. The calls of methods
+                bound to an instance also set `this` in it (see `Instance.bind_method`)
+    class     - the class body, shared by all the instances of the class
+    block     - created for the bodies of `if`, `for` and `while` (but not `for ... in`, `try` or `switch`)
+
+Blocks declaring no variables are elided: they run directly in the enclosing scope, which saves a `Context` and a
+`SymbolTable` per execution (every iteration of a loop) and doesn't change the meaning of any name. Elided blocks
+don't count in depths.
+
+Returns of a call in the body of a function are marked as tail calls, unless they are in a `try` (whose handler
+must still be able to catch the errors of the call). The called function then runs in place of the one returning
+(see `Function.call`), so tail recursion runs in constant stack.
+
+At runtime `SymbolTable.lookup` jumps directly to the table `depth` levels up, and falls back to the regular
+dynamic lookup when the variable isn't there: variables not declared yet, builtins, or globals created by
+`require`. Only the farthest (global) table can get new names without a declaration in the AST, so a resolved
+depth never skips a nearer variable.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Optional, TypeAlias
+
+from core.nodes import (
+    CallNode,
+    ClassNode,
+    DecNode,
+    ForInNode,
+    ForNode,
+    FromImportNode,
+    FuncDefNode,
+    IfNode,
+    ImportNode,
+    IncNode,
+    Node,
+    ReturnNode,
+    TryNode,
+    VarAccessNode,
+    VarAssignNode,
+    WhileNode,
+    iter_child_nodes,
+)
+
+ResolvableNode: TypeAlias = VarAccessNode | VarAssignNode | IncNode | DecNode
+
+
+class Scope:
+    parent: Optional[Scope]
+    names: set[str]
+    elided: bool
+
+    def __init__(self, parent: Optional[Scope] = None, names: Optional[set[str]] = None) -> None:
+        self.parent = parent
+        self.names = names if names is not None else set()
+        self.elided = False
+
+    def depth_of(self, name: str) -> Optional[int]:
+        scope: Optional[Scope] = self
+        depth = 0
+        while scope is not None:
+            if name in scope.names:
+                return depth
+            if not scope.elided:
+                depth += 1
+            scope = scope.parent
+        return None
+
+
+class Resolver:
+    scope: Scope
+    # Declarations can appear after the nodes using them, so nodes are only annotated once every scope is complete
+    pending: list[tuple[ResolvableNode, str, Scope]]
+    # Whether a `return` can make a tail call: in a function, outside of `try`
+    tail_calls: bool
+    # Whether the functions defined here are methods: in a class body
+    methods: bool
+
+    def __init__(self) -> None:
+        self.scope = Scope()
+        self.pending = []
+        self.tail_calls = False
+        self.methods = False
+
+    def resolve(self, node: Node) -> None:
+        self.visit(node)
+        for resolvable, name, scope in self.pending:
+            resolvable.depth = scope.depth_of(name)
+        self.pending.clear()
+
+    def visit(self, node: Node) -> None:
+        method: Callable[[Node], None] = getattr(self, f"visit_{type(node).__name__}", self.visit_children)
+        method(node)
+
+    def visit_children(self, node: Node) -> None:
+        for child in iter_child_nodes(node):
+            self.visit(child)
+
+    def visit_in_scope(self, node: Node, scope: Scope) -> None:
+        parent = self.scope
+        self.scope = scope
+        self.visit(node)
+        self.scope = parent
+
+    def visit_block(self, node: Node) -> bool:
+        """Visit the body of a block, returns whether it needs its own scope"""
+        scope = Scope(self.scope)
+        self.visit_in_scope(node, scope)
+        scope.elided = len(scope.names) == 0
+        return not scope.elided
+
+    def declare(self, name: object) -> None:
+        if isinstance(name, str):
+            self.scope.names.add(name)
+
+    def use(self, node: ResolvableNode, name: object) -> None:
+        if isinstance(name, str):
+            self.pending.append((node, name, self.scope))
+
+    ###################################
+
+    def visit_VarAccessNode(self, node: VarAccessNode) -> None:
+        self.use(node, node.var_name_tok.value)
+
+    def visit_VarAssignNode(self, node: VarAssignNode) -> None:
+        self.visit(node.value_node)
+        if node.qualifier is not None:
+            self.declare(node.var_name_tok.value)
+        elif node.extra_names == []:
+            self.use(node, node.var_name_tok.value)
+
+    def visit_IncNode(self, node: IncNode | DecNode) -> None:
+        self.use(node, node.var_name_tok.value)
+
+    visit_DecNode = visit_IncNode
+
+    def visit_IfNode(self, node: IfNode) -> None:
+        for i, (condition, expr, _) in enumerate(node.cases):
+            self.visit(condition)
+            node.case_scopes[i] = self.visit_block(expr)
+        if node.else_case is not None:
+            node.else_scope = self.visit_block(node.else_case[0])
+
+    def visit_ForNode(self, node: ForNode) -> None:
+        self.visit(node.start_value_node)
+        self.visit(node.end_value_node)
+        if node.step_value_node is not None:
+            self.visit(node.step_value_node)
+        self.declare(node.var_name_tok.value)
+        node.body_scope = self.visit_block(node.body_node)
+
+    def visit_WhileNode(self, node: WhileNode) -> None:
+        self.visit(node.condition_node)
+        node.body_scope = self.visit_block(node.body_node)
+
+    def visit_ForInNode(self, node: ForInNode) -> None:
+        self.visit(node.iterable_node)
+        self.declare(node.var_name_tok.value)
+        self.visit(node.body_node)
+
+    def visit_ReturnNode(self, node: ReturnNode) -> None:
+        node.tail_call = self.tail_calls and isinstance(node.node_to_return, CallNode)
+        self.visit_children(node)
+
+    def visit_TryNode(self, node: TryNode) -> None:
+        tail_calls = self.tail_calls
+        self.tail_calls = False
+        self.visit(node.try_block)
+        self.declare(node.exc_iden.value)
+        self.visit(node.catch_block)
+        self.tail_calls = tail_calls
+
+    def visit_FuncDefNode(self, node: FuncDefNode) -> None:
+        if node.var_name_tok is not None:
+            self.declare(node.var_name_tok.value)
+        for default in node.defaults:
+            if default is not None:
+                self.visit(default)
+
+        args = {str(arg_name.value) for arg_name in node.arg_name_toks}
+        if node.va_name is not None:
+            args.add(node.va_name)
+        if self.methods:
+            args.add("this")
+        tail_calls, methods = self.tail_calls, self.methods
+        self.tail_calls, self.methods = True, False
+        self.visit_in_scope(node.body_node, Scope(self.scope, args))
+        self.tail_calls, self.methods = tail_calls, methods
+
+    def visit_ClassNode(self, node: ClassNode) -> None:
+        self.declare(node.class_name_tok.value)
+        tail_calls, methods = self.tail_calls, self.methods
+        self.tail_calls, self.methods = False, True
+        self.visit_in_scope(node.body_nodes, Scope(self.scope))
+        self.tail_calls, self.methods = tail_calls, methods
+
+    def visit_ImportNode(self, node: ImportNode) -> None:
+        self.declare(node.name.value if node.name is not None else node.module.value)
+
+    def visit_FromImportNode(self, node: FromImportNode) -> None:
+        for _, name_tok in node.names:
+            self.declare(name_tok.value)
+
+
+def resolve(node: Node) -> None:
+    """Annotate the variables of a program with their lexical depth"""
+    Resolver().resolve(node)
@@ -30,7 +30,7 @@ LETTERS = string.ascii_letters + "$_"
 VALID_IDENTIFIERS = LETTERS + DIGITS
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Cursor Position"""
 
@@ -142,6 +142,7 @@ TokenValue: TypeAlias = Optional[str | int | float]
 
 class Token:
     __match_args__ = "type", "value"
+    __slots__ = ("type", "value", "pos_start", "pos_end")
 
     type: TokenType
     value: TokenValue
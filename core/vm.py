@@ -0,0 +1,883 @@
+"""Bytecode compiler and stack-based virtual machine
+
+`Compiler` turns an AST into a `CodeObject`: a linear sequence of instructions (one opcode and one integer
+argument each), a constant pool and a line table mapping every instruction back to the `Position`s of the node
+it was compiled from. `execute` runs a `CodeObject` on a value stack.
+
+Nodes that are rarely executed in hot code (imports, classes, `try`, ...) are compiled to a single `EVAL`
+instruction running the regular `Interpreter.visit_*` method, whose children are compiled on first use. `switch`
+statements are tree-walked apart from the functions defined in them, since `fallthrough` and `fallout` are
+implemented with flags on `RTResult` that leak through every enclosing node.
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Callable, Optional
+
+from core.datatypes import (
+    DEFAULT_CONSTRUCTOR_BODY,
+    Array,
+    AttributeCache,
+    BaseClass,
+    BaseFunction,
+    BaseInstance,
+    Function,
+    Module,
+    Null,
+    Number,
+    ResultTuple,
+    Value,
+    located_error,
+)
+from core.errors import RNNameError, RTError
+from core.interpreter import Interpreter, binary_operation, short_circuit_and, short_circuit_or
+from core.nodes import (
+    ArrayNode,
+    AttrAccessNode,
+    BinOpNode,
+    BlockNode,
+    BreakNode,
+    CallNode,
+    ConstantNode,
+    ContinueNode,
+    DecNode,
+    ForInNode,
+    ForNode,
+    FuncDefNode,
+    IfNode,
+    IncNode,
+    IndexGetNode,
+    IndexSetNode,
+    Node,
+    NumberNode,
+    ReturnNode,
+    StringNode,
+    SwitchNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    WhileNode,
+)
+from core.parser import Context, RTResult, SymbolTable
+from core.tokens import TT_KEYWORD, TT_MINUS, Position
+
+# Opcodes
+LOAD_NULL = 0  # push null
+LOAD_CONST = 1  # push the value consts[arg] (a literal or a value computed by the optimizer)
+LOAD_NAME = 2  # push the variable described by consts[arg] = (name, depth)
+STORE_NAME = 3  # assign the top of the stack to the variable described by consts[arg] = (name, qualifier, depth)
+ASSIGN = 4  # assign the top of the stack to the attribute described by consts[arg] = (name, extra_names)
+BINARY_OP = 5  # pop right, left and push the result of the operation consts[arg] (an `Operation`)
+UNARY_OP = 6  # pop operand and push consts[arg](operand)
+BUILD_ARRAY = 7  # pop arg values and push them as an array
+POP_TOP = 8  # pop the top of the stack
+JUMP = 9  # jump to arg
+POP_JUMP_IF_FALSE = 10  # pop the top of the stack and jump to arg if it is not true
+PUSH_SCOPE = 11  # enter a new block scope
+POP_SCOPE = 12  # leave the current block scope
+CHECK_NUMBER = 13  # fail with FOR_ERRORS[arg] if the top of the stack is not a number
+SETUP_FOR = 14  # pop step, end, start and enter a `for` loop exiting at arg
+FOR_ITER = 15  # assign the next value of the loop to the variable names[arg], or exit the loop
+SETUP_WHILE = 16  # enter a `while` loop exiting at arg
+SETUP_FOR_IN = 17  # pop an iterable and enter a `for ... in` loop exiting at arg
+FOR_IN_NEXT = 18  # assign the next element of the iterable to the variable names[arg], or exit the loop
+LOOP_APPEND = 19  # pop the value of the loop body and append it to the results of the loop
+END_LOOP = 20  # leave the current loop and push its result (null if arg is set)
+BREAK = 21  # exit the current loop
+CONTINUE = 22  # jump to the next iteration of the current loop
+MAKE_FUNCTION = 23  # pop the defaults and push the function described by consts[arg]
+CALL = 24  # pop the kwargs, args and callee described by consts[arg] = (argc, kwarg names), push the result
+RETURN_VALUE = 25  # return the top of the stack from the function
+INDEX_GET = 26  # pop index, indexee and push indexee[index]
+INDEX_SET = 27  # pop value, index, indexee, set indexee[index] = value and push the result
+LOAD_ATTR = 28  # pop an object and push its attribute, looked up with the `AttributeCache` consts[arg]
+STEP = 29  # increment or decrement the variable described by consts[arg]
+EVAL = 30  # push the result of consts[arg](context)
+RETURN = 31  # end of the code, return the top of the stack
+AND_JUMP = 32  # if the top of the stack decides the result of `and`, replace it with the result and jump to arg
+OR_JUMP = 33  # if the top of the stack decides the result of `or`, replace it with the result and jump to arg
+TAIL_CALL = 34  # like CALL, but return a tail call of the callee if it is a `Function` (followed by RETURN_VALUE)
+
+# Only used for the helpers shared with the visitor (`assign`)
+interpreter = Interpreter()
+
+FOR_ERRORS = ["Start value must be a number", "End value must be a number", "Step value must be a number"]
+
+
+class CodeObject:
+    """Compiled bytecode of a node"""
+
+    ops: list[int]
+    args: list[int]
+    consts: list[Any]
+    names: list[str]
+    # Run-length encoded: (first instruction, pos_start, pos_end), sorted by first instruction
+    line_table: list[tuple[int, Position, Position]]
+    # Decoded line table, one entry per instruction
+    positions: list[tuple[Position, Position]]
+
+    def __init__(
+        self,
+        ops: list[int],
+        args: list[int],
+        consts: list[Any],
+        names: list[str],
+        line_table: list[tuple[int, Position, Position]],
+    ) -> None:
+        self.ops = ops
+        self.args = args
+        self.consts = consts
+        self.names = names
+        self.line_table = line_table
+
+        self.positions = []
+        for i, (pc, pos_start, pos_end) in enumerate(line_table):
+            end = line_table[i + 1][0] if i + 1 < len(line_table) else len(ops)
+            self.positions.extend([(pos_start, pos_end)] * (end - pc))
+
+
+class CodeNode:
+    """A node compiled to bytecode on first execution, used as the body of compiled functions
+
+    The other engines run the original `node` (see `Interpreter.visit_CodeNode`)."""
+
+    node: Node
+    code: Optional[CodeObject]
+
+    pos_start: Position
+    pos_end: Position
+
+    def __init__(self, node: Node) -> None:
+        self.node = node
+        self.code = None
+
+        self.pos_start = node.pos_start
+        self.pos_end = node.pos_end
+
+
+class FunctionTemplate:
+    """Everything needed by MAKE_FUNCTION to create a function, apart from its default values"""
+
+    name: Optional[str]
+    body_node: CodeNode
+    arg_names: list[str]
+    has_defaults: list[bool]
+    should_auto_return: bool
+    desc: str
+    va_name: Optional[str]
+    max_pos_args: int
+    static: bool
+
+    def __init__(self, node: FuncDefNode) -> None:
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        assert func_name is None or isinstance(func_name, str)
+        self.name = func_name
+        self.body_node = CodeNode(node.body_node)
+        self.arg_names = [str(arg_name.value) for arg_name in node.arg_name_toks]
+        self.has_defaults = [default is not None for default in node.defaults]
+        self.should_auto_return = node.should_auto_return
+        self.desc = node.desc
+        self.va_name = node.va_name
+        self.max_pos_args = node.max_pos_args
+        self.static = node.static
+
+
+class Loop:
+    """Runtime state of a loop being executed"""
+
+    depth: int
+    context: Context
+    head: int
+    exit: int
+    elements: list[Value]
+
+    # `for` loops
+    i: int | float
+    end: int | float
+    step: int | float
+
+    # `for ... in` loops
+    iterable: Value
+    it: Any
+
+    def __init__(self, depth: int, context: Context, head: int, exit: int) -> None:
+        self.depth = depth
+        self.context = context
+        self.head = head
+        self.exit = exit
+        self.elements = []
+
+
+class EvalInterpreter(Interpreter):
+    """Runs a node with the regular visitor methods, compiling the children it visits on first use"""
+
+    codes: dict[int, CodeObject]
+
+    def __init__(self) -> None:
+        self.codes = {}
+
+    def visit(self, node: Node, context: Context) -> RTResult[Value]:
+        # The parent node is kept alive by the constant pool, so ids can't be reused
+        code = self.codes.get(id(node))
+        if code is None:
+            code = self.codes[id(node)] = Compiler().compile(node)
+        return execute(code, context)
+
+
+class SwitchInterpreter(EvalInterpreter):
+    """Walks a `switch` with the regular visitor methods, only compiling the functions defined in it so that their
+    bodies are `CodeNode`s like everywhere else"""
+
+    def visit(self, node: Node, context: Context) -> RTResult[Value]:
+        if isinstance(node, FuncDefNode):
+            return super().visit(node, context)
+        return Interpreter.visit(self, node, context)
+
+
+class Compiler:
+    ops: list[int]
+    args: list[int]
+    consts: list[Any]
+    names: list[str]
+    name_indices: dict[str, int]
+    line_table: list[tuple[int, Position, Position]]
+
+    def __init__(self) -> None:
+        self.ops = []
+        self.args = []
+        self.consts = []
+        self.names = []
+        self.name_indices = {}
+        self.line_table = []
+
+    def compile(self, node: Node) -> CodeObject:
+        self.compile_node(node)
+        self.emit(RETURN, 0, node)
+        return CodeObject(self.ops, self.args, self.consts, self.names, self.line_table)
+
+    def emit(self, op: int, arg: int, node: Node) -> int:
+        pc = len(self.ops)
+        if len(self.line_table) == 0 or (
+            self.line_table[-1][1] is not node.pos_start or self.line_table[-1][2] is not node.pos_end
+        ):
+            self.line_table.append((pc, node.pos_start, node.pos_end))
+        self.ops.append(op)
+        self.args.append(arg)
+        return pc
+
+    def patch(self, pc: int) -> None:
+        """Make the jump at `pc` target the next instruction"""
+        self.args[pc] = len(self.ops)
+
+    def const(self, value: Any) -> int:
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def name(self, name: str) -> int:
+        index = self.name_indices.get(name)
+        if index is None:
+            index = self.name_indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def compile_node(self, node: Node) -> None:
+        method: Optional[Callable[[Node], None]] = getattr(self, f"compile_{type(node).__name__}", None)
+        if method is None:
+            self.compile_fallback(node)
+        else:
+            method(node)
+
+    def compile_fallback(self, node: Node) -> None:
+        interpreter = EvalInterpreter()
+        method: Callable[[Node, Context], RTResult[Value]] = getattr(
+            interpreter, f"visit_{type(node).__name__}", interpreter.no_visit_method
+        )
+
+        def evaluate(context: Context) -> RTResult[Value]:
+            return method(node, context)
+
+        self.emit(EVAL, self.const(evaluate), node)
+
+    def compile_block(self, node: Node, should_return_null: bool, scoped: bool) -> None:
+        if scoped:
+            self.emit(PUSH_SCOPE, 0, node)
+        self.compile_node(node)
+        if scoped:
+            self.emit(POP_SCOPE, 0, node)
+        if should_return_null:
+            self.emit(POP_TOP, 0, node)
+            self.emit(LOAD_NULL, 0, node)
+
+    def compile_loop_body(self, node: Node, should_return_null: bool, scoped: bool) -> None:
+        if scoped:
+            self.emit(PUSH_SCOPE, 0, node)
+        self.compile_node(node)
+        if scoped:
+            self.emit(POP_SCOPE, 0, node)
+        self.emit(POP_TOP if should_return_null else LOOP_APPEND, 0, node)
+
+    ###################################
+
+    def compile_NullNode(self, node: Node) -> None:
+        self.emit(LOAD_NULL, 0, node)
+
+    def compile_NumberNode(self, node: NumberNode) -> None:
+        self.emit(LOAD_CONST, self.const(node.value), node)
+
+    def compile_StringNode(self, node: StringNode) -> None:
+        self.emit(LOAD_CONST, self.const(node.value), node)
+
+    def compile_ArrayNode(self, node: ArrayNode) -> None:
+        for element_node in node.element_nodes:
+            self.compile_node(element_node)
+        self.emit(BUILD_ARRAY, len(node.element_nodes), node)
+
+    def compile_ConstantNode(self, node: ConstantNode) -> None:
+        self.emit(LOAD_CONST, self.const(node.value), node)
+
+    def compile_BlockNode(self, node: BlockNode) -> None:
+        if len(node.statements) == 0:
+            self.emit(LOAD_NULL, 0, node)
+            return
+        for statement in node.statements[:-1]:
+            self.compile_node(statement)
+            self.emit(POP_TOP, 0, statement)
+        self.compile_node(node.statements[-1])
+
+    def compile_VarAccessNode(self, node: VarAccessNode) -> None:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "This could be a bug in the lexer"
+        self.emit(LOAD_NAME, self.const((var_name, node.depth)), node)
+
+    def compile_VarAssignNode(self, node: VarAssignNode) -> None:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str)
+        self.compile_node(node.value_node)
+        if node.extra_names != []:
+            self.emit(ASSIGN, self.const((var_name, node.extra_names)), node)
+        else:
+            qualifier = None if node.qualifier is None else node.qualifier.value
+            assert qualifier is None or isinstance(qualifier, str)
+            self.emit(STORE_NAME, self.const((var_name, qualifier, node.depth)), node)
+
+    def compile_BinOpNode(self, node: BinOpNode) -> None:
+        operation = binary_operation(node.op_tok)
+        self.compile_node(node.left_node)
+        short_circuit = None
+        if operation.short_circuit is not None:
+            short_circuit = self.emit(AND_JUMP if operation.short_circuit is short_circuit_and else OR_JUMP, 0, node)
+        self.compile_node(node.right_node)
+        self.emit(BINARY_OP, self.const(operation), node)
+        if short_circuit is not None:
+            self.patch(short_circuit)
+
+    def compile_UnaryOpNode(self, node: UnaryOpNode) -> None:
+        operation: Callable[[Value], ResultTuple]
+        if node.op_tok.type == TT_MINUS:
+            operation = lambda operand: operand.multed_by(Number(-1))  # noqa: E731
+        elif node.op_tok.matches(TT_KEYWORD, "not"):
+            operation = lambda operand: operand.notted()  # noqa: E731
+        else:
+            assert False, f"invalid unary operation: {node.op_tok}, this is probably a bug in the parser."
+
+        self.compile_node(node.node)
+        self.emit(UNARY_OP, self.const(operation), node)
+
+    def compile_IfNode(self, node: IfNode) -> None:
+        end_jumps: list[int] = []
+        for (condition, expr, should_return_null), scoped in zip(node.cases, node.case_scopes):
+            self.compile_node(condition)
+            next_case = self.emit(POP_JUMP_IF_FALSE, 0, condition)
+            self.compile_block(expr, should_return_null, scoped)
+            end_jumps.append(self.emit(JUMP, 0, node))
+            self.patch(next_case)
+
+        if node.else_case is not None:
+            expr, should_return_null = node.else_case
+            self.compile_block(expr, should_return_null, node.else_scope)
+        else:
+            self.emit(LOAD_NULL, 0, node)
+
+        for end_jump in end_jumps:
+            self.patch(end_jump)
+
+    def compile_ForNode(self, node: ForNode) -> None:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "this could be a bug in the parser"
+
+        self.compile_node(node.start_value_node)
+        self.emit(CHECK_NUMBER, 0, node.start_value_node)
+        self.compile_node(node.end_value_node)
+        self.emit(CHECK_NUMBER, 1, node.end_value_node)
+        if node.step_value_node is not None:
+            self.compile_node(node.step_value_node)
+            self.emit(CHECK_NUMBER, 2, node.step_value_node)
+        else:
+            self.emit(LOAD_CONST, self.const(Number.one()), node)
+
+        setup = self.emit(SETUP_FOR, 0, node)
+        head = self.emit(FOR_ITER, self.name(var_name), node)
+        self.compile_loop_body(node.body_node, node.should_return_null, node.body_scope)
+        self.emit(JUMP, head, node)
+        self.patch(setup)
+        self.emit(END_LOOP, int(node.should_return_null), node)
+
+    def compile_WhileNode(self, node: WhileNode) -> None:
+        setup = self.emit(SETUP_WHILE, 0, node)
+        head = len(self.ops)
+        self.compile_node(node.condition_node)
+        exit = self.emit(POP_JUMP_IF_FALSE, 0, node.condition_node)
+        self.compile_loop_body(node.body_node, node.should_return_null, node.body_scope)
+        self.emit(JUMP, head, node)
+        self.patch(setup)
+        self.patch(exit)
+        self.emit(END_LOOP, int(node.should_return_null), node)
+
+    def compile_ForInNode(self, node: ForInNode) -> None:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "This could be a bug in the lexer"
+
+        self.compile_node(node.iterable_node)
+        setup = self.emit(SETUP_FOR_IN, 0, node)
+        # Errors of the iteration are placed at the iterable
+        head = self.emit(FOR_IN_NEXT, self.name(var_name), node.iterable_node)
+        self.compile_loop_body(node.body_node, node.should_return_null, scoped=False)
+        self.emit(JUMP, head, node)
+        self.patch(setup)
+        self.emit(END_LOOP, int(node.should_return_null), node)
+
+    def compile_FuncDefNode(self, node: FuncDefNode) -> None:
+        for default in node.defaults:
+            if default is not None:
+                self.compile_node(default)
+        self.emit(MAKE_FUNCTION, self.const(FunctionTemplate(node)), node)
+
+    def compile_CallNode(self, node: CallNode, op: int = CALL) -> None:
+        self.compile_node(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.compile_node(arg_node)
+        for kwarg_node in node.kwarg_nodes.values():
+            self.compile_node(kwarg_node)
+        self.emit(op, self.const((len(node.arg_nodes), tuple(node.kwarg_nodes.keys()))), node)
+
+    def compile_ReturnNode(self, node: ReturnNode) -> None:
+        if node.tail_call:
+            assert isinstance(node.node_to_return, CallNode)
+            self.compile_CallNode(node.node_to_return, TAIL_CALL)
+        elif node.node_to_return is not None:
+            self.compile_node(node.node_to_return)
+        else:
+            self.emit(LOAD_NULL, 0, node)
+        self.emit(RETURN_VALUE, 0, node)
+
+    def compile_ContinueNode(self, node: ContinueNode) -> None:
+        self.emit(CONTINUE, 0, node)
+
+    def compile_BreakNode(self, node: BreakNode) -> None:
+        self.emit(BREAK, 0, node)
+
+    def compile_IndexGetNode(self, node: IndexGetNode) -> None:
+        self.compile_node(node.indexee)
+        self.compile_node(node.index)
+        self.emit(INDEX_GET, 0, node)
+
+    def compile_IndexSetNode(self, node: IndexSetNode) -> None:
+        self.compile_node(node.indexee)
+        self.compile_node(node.index)
+        self.compile_node(node.value)
+        self.emit(INDEX_SET, 0, node)
+
+    def compile_AttrAccessNode(self, node: AttrAccessNode) -> None:
+        attr_name = node.attr_name_tok.value
+        assert isinstance(attr_name, str), "This could be a bug in the lexer"
+        self.compile_node(node.node_to_access)
+        self.emit(LOAD_ATTR, self.const(AttributeCache(attr_name)), node)
+
+    def compile_IncNode(self, node: IncNode) -> None:
+        self.compile_step(node, lambda value: value.added_to(Number.one()))
+
+    def compile_DecNode(self, node: DecNode) -> None:
+        self.compile_step(node, lambda value: value.subbed_by(Number.one()))
+
+    def compile_step(self, node: IncNode | DecNode, operation: Callable[[Value], ResultTuple]) -> None:
+        var_name = node.var_name_tok.value
+        assert isinstance(var_name, str), "This could be a bug in the lexer"
+        step = (var_name, node.depth, node.extra_names, node.qualifier, node.is_pre, operation)
+        self.emit(STEP, self.const(step), node)
+
+    def compile_SwitchNode(self, node: SwitchNode) -> None:
+        switch_interpreter = SwitchInterpreter()
+
+        def evaluate(context: Context) -> RTResult[Value]:
+            return switch_interpreter.visit_SwitchNode(node, context)
+
+        self.emit(EVAL, self.const(evaluate), node)
+
+
+def propagate(result: RTResult[Value]) -> RTResult[Value]:
+    """Propagate a returning result the same way `RTResult.register` does in the tree-walker"""
+    res: RTResult[Value] = RTResult()
+    res.register(result)
+    return res
+
+
+def execute(code: CodeObject, context: Context) -> RTResult[Value]:
+    ops = code.ops
+    args = code.args
+    consts = code.consts
+    names = code.names
+    positions = code.positions
+
+    stack: list[Value] = []
+    loops: list[Loop] = []
+    pc = 0
+
+    try:
+        while True:
+            op = ops[pc]
+            arg = args[pc]
+            pc += 1
+
+            if op == LOAD_NAME:
+                name, depth = consts[arg]
+                value = context.symbol_table.lookup(name, depth)
+                pos_start, pos_end = positions[pc - 1]
+                if value is None:
+                    return RTResult[Value]().failure(
+                        RNNameError(pos_start, pos_end, f"'{name}' is not defined", context)
+                    )
+                stack.append(value)
+
+            elif op == LOAD_CONST:
+                stack.append(consts[arg])
+
+            elif op == BINARY_OP:
+                right = stack.pop()
+                left = stack.pop()
+                operation = consts[arg]
+                if operation.number is not None and type(left) is Number and type(right) is Number:
+                    function, result_type = operation.number
+                    try:
+                        value = function(left.value, right.value)
+                    except ZeroDivisionError:
+                        pass
+                    else:
+                        stack.append(result_type.of(value))
+                        continue
+                result, error = operation.generic(left, right)
+                if error:
+                    return RTResult[Value]().failure(located_error(error, (left, right), *positions[pc - 1], context))
+                assert result is not None
+                stack.append(result)
+
+            elif op == AND_JUMP or op == OR_JUMP:
+                decided = (short_circuit_and if op == AND_JUMP else short_circuit_or)(stack[-1])
+                if decided is not None:
+                    stack[-1] = decided
+                    pc = arg
+
+            elif op == POP_TOP:
+                stack.pop()
+
+            elif op == JUMP:
+                pc = arg
+
+            elif op == POP_JUMP_IF_FALSE:
+                if not stack.pop().is_true():
+                    pc = arg
+
+            elif op == PUSH_SCOPE:
+                context = Context("<block scope>", context, positions[pc - 1][0], SymbolTable(context.symbol_table))
+
+            elif op == POP_SCOPE:
+                assert context.parent is not None
+                context = context.parent
+
+            elif op == STORE_NAME:
+                name, qualifier, depth = consts[arg]
+                error = context.symbol_table.set_var(name, stack[-1], qualifier, depth).error
+                if error is not None:
+                    return RTResult[Value]().failure(located_error(error, (stack[-1],), *positions[pc - 1], context))
+
+            elif op == FOR_ITER:
+                loop = loops[-1]
+                if loop.i < loop.end if loop.step >= 0 else loop.i > loop.end:
+                    context.symbol_table.set(names[arg], Number(loop.i))
+                    loop.i += loop.step
+                else:
+                    pc = loop.exit
+
+            elif op == LOOP_APPEND:
+                loops[-1].elements.append(stack.pop())
+
+            elif op == CALL or op == TAIL_CALL:
+                argc, kwarg_names = consts[arg]
+                kwargc = len(kwarg_names)
+                kwargs = dict(zip(kwarg_names, stack[len(stack) - kwargc :])) if kwargc else {}
+                call_args = stack[len(stack) - kwargc - argc : len(stack) - kwargc]
+                del stack[len(stack) - kwargc - argc :]
+                value_to_call = stack.pop()
+                pos_start, pos_end = positions[pc - 1]
+                if op == TAIL_CALL and isinstance(value_to_call, Function):
+                    return RTResult[Value]().success_tail_call(
+                        value_to_call, call_args, kwargs, pos_start, pos_end, context
+                    )
+
+                result_ = value_to_call.call(call_args, kwargs, pos_start, pos_end, context)
+                if result_.should_return():
+                    if loops and (result_.loop_should_break or result_.loop_should_continue):
+                        loop = loops[-1]
+                        del stack[loop.depth :]
+                        context = loop.context
+                        pc = loop.exit if result_.loop_should_break else loop.head
+                        continue
+                    return propagate(result_)
+                assert result_.value is not None
+                stack.append(result_.value)
+
+            elif op == LOAD_NULL:
+                stack.append(Null.null())
+
+            elif op == BUILD_ARRAY:
+                elements = stack[len(stack) - arg :] if arg else []
+                del stack[len(stack) - arg :]
+                pos_start, pos_end = positions[pc - 1]
+                stack.append(Array(elements).set_context(context).set_pos(pos_start, pos_end))
+
+            elif op == RETURN_VALUE:
+                return RTResult[Value]().success_return(stack.pop())
+
+            elif op == UNARY_OP:
+                operand = stack.pop()
+                result, error = consts[arg](operand)
+                if error:
+                    return RTResult[Value]().failure(located_error(error, (operand,), *positions[pc - 1], context))
+                assert result is not None
+                stack.append(result)
+
+            elif op == INDEX_GET:
+                index = stack.pop()
+                indexee = stack.pop()
+                result, error = indexee.get_index(index)
+                if error is not None:
+                    return RTResult[Value]().failure(
+                        located_error(error, (indexee, index), *positions[pc - 1], context)
+                    )
+                assert result is not None
+                stack.append(result)
+
+            elif op == INDEX_SET:
+                value = stack.pop()
+                index = stack.pop()
+                indexee = stack.pop()
+                result, error = indexee.set_index(index, value)
+                if error:
+                    operands = (indexee, index, value)
+                    return RTResult[Value]().failure(located_error(error, operands, *positions[pc - 1], context))
+                assert result is not None
+                stack.append(result)
+
+            elif op == LOAD_ATTR:
+                obj = stack.pop()
+                pos_start, pos_end = positions[pc - 1]
+                if not isinstance(obj, (BaseClass, BaseInstance, Module)):
+                    return RTResult[Value]().failure(
+                        RTError(
+                            pos_start,
+                            pos_end,
+                            "Dotted attribute access may only be used on classes, instances and modules for now",
+                            context,
+                        )
+                    )
+
+                cache = consts[arg]
+                attr = cache.get(obj)
+                if attr is None:
+                    return RTResult[Value]().failure(
+                        RTError(pos_start, pos_end, f"Attribute '{cache.name}' does not exist", context)
+                    )
+
+                if isinstance(obj, BaseInstance) and isinstance(attr, BaseFunction):
+                    res: RTResult[Value] = RTResult()
+                    attr = res.register(obj.get_bound_method(cache.name, attr))
+                    if res.should_return():
+                        return res
+                assert attr is not None
+                stack.append(attr)
+
+            elif op == STEP:
+                name, depth, extra_names, qualifier, pre, operation = consts[arg]
+                pos_start, pos_end = positions[pc - 1]
+                old_value = context.symbol_table.lookup(name, depth)
+                if old_value is None:
+                    return RTResult[Value]().failure(
+                        RNNameError(pos_start, pos_end, f"'{name}' is not defined", context)
+                    )
+
+                new_value, error = operation(old_value)
+                if error is not None:
+                    return RTResult[Value]().failure(located_error(error, (old_value,), pos_start, pos_end, context))
+                assert new_value is not None
+
+                res = RTResult()
+                res.register(
+                    interpreter.assign(
+                        var_name=name,
+                        value=new_value,
+                        context=context,
+                        extra_names=extra_names,
+                        qualifier=qualifier,
+                        depth=depth,
+                        pos_start=pos_start,
+                        pos_end=pos_end,
+                    )
+                )
+                if res.should_return():
+                    return res
+                stack.append(new_value if pre else old_value)
+
+            elif op == CHECK_NUMBER:
+                if not isinstance(stack[-1], Number):
+                    pos_start, pos_end = positions[pc - 1]
+                    return RTResult[Value]().failure(RTError(pos_start, pos_end, FOR_ERRORS[arg], context))
+
+            elif op == SETUP_FOR:
+                step = stack.pop()
+                end = stack.pop()
+                start = stack.pop()
+                assert isinstance(start, Number) and isinstance(end, Number) and isinstance(step, Number)
+                loop = Loop(len(stack), context, pc, arg)
+                loop.i = start.value
+                loop.end = end.value
+                loop.step = step.value
+                loops.append(loop)
+
+            elif op == SETUP_WHILE:
+                loops.append(Loop(len(stack), context, pc, arg))
+
+            elif op == SETUP_FOR_IN:
+                loop = Loop(len(stack) - 1, context, pc, arg)
+                loop.iterable = stack.pop()
+                loop.it = loop.iterable.iter()
+                loops.append(loop)
+
+            elif op == FOR_IN_NEXT:
+                loop = loops[-1]
+                it_res = next(loop.it, None)
+                if it_res is None:
+                    pc = loop.exit
+                    continue
+                if it_res.error is not None:
+                    error = located_error(it_res.error, (loop.iterable,), *positions[pc - 1], context)
+                    return RTResult[Value]().failure(error)
+                if it_res.should_return():
+                    return propagate(it_res)
+                assert it_res.value is not None
+                context.symbol_table.set(names[arg], it_res.value)
+
+            elif op == END_LOOP:
+                loop = loops.pop()
+                if arg:
+                    stack.append(Null.null())
+                else:
+                    pos_start, pos_end = positions[pc - 1]
+                    stack.append(Array(loop.elements).set_context(context).set_pos(pos_start, pos_end))
+
+            elif op == BREAK or op == CONTINUE:
+                if not loops:
+                    res = RTResult()
+                    return res.success_break() if op == BREAK else res.success_continue()
+                loop = loops[-1]
+                del stack[loop.depth :]
+                context = loop.context
+                pc = loop.exit if op == BREAK else loop.head
+
+            elif op == MAKE_FUNCTION:
+                template: FunctionTemplate = consts[arg]
+                defaults: list[Optional[Value]] = []
+                default_count = sum(template.has_defaults)
+                default_values = stack[len(stack) - default_count :] if default_count else []
+                del stack[len(stack) - default_count :]
+                for has_default in template.has_defaults:
+                    defaults.append(default_values.pop(0) if has_default else None)
+
+                pos_start, pos_end = positions[pc - 1]
+                func_value = (
+                    Function(
+                        template.name,
+                        context.symbol_table,
+                        template.body_node,
+                        template.arg_names,
+                        defaults,
+                        template.should_auto_return,
+                        template.desc,
+                        va_name=template.va_name,
+                        max_pos_args=template.max_pos_args,
+                    )
+                    .set_context(context)
+                    .set_pos(pos_start, pos_end)
+                )
+
+                if template.name is not None:
+                    if template.static:
+                        context.symbol_table.set_static(template.name, func_value, "var")
+                    else:
+                        context.symbol_table.set(template.name, func_value)
+                stack.append(func_value)
+
+            elif op == ASSIGN:
+                name, extra_names = consts[arg]
+                pos_start, pos_end = positions[pc - 1]
+                res = interpreter.assign(
+                    var_name=name,
+                    value=stack[-1],
+                    context=context,
+                    extra_names=extra_names,
+                    pos_start=pos_start,
+                    pos_end=pos_end,
+                )
+                if res.should_return():
+                    return res
+
+            elif op == EVAL:
+                result_ = consts[arg](context)
+                if result_.should_return():
+                    if loops and (result_.loop_should_break or result_.loop_should_continue):
+                        loop = loops[-1]
+                        del stack[loop.depth :]
+                        context = loop.context
+                        pc = loop.exit if result_.loop_should_break else loop.head
+                        continue
+                    return propagate(result_)
+                assert result_.value is not None
+                stack.append(result_.value)
+
+            elif op == RETURN:
+                return RTResult[Value]().success(stack.pop())
+
+            else:
+                assert False, f"invalid opcode {op}, this is probably a bug in the compiler."
+    except Exception as e:
+        if sys.version_info >= (3, 11):
+            pos_start, pos_end = positions[pc - 1]
+            e.add_note(f"{pos_start} - {pos_end}: NOTE: happened here")
+        raise
+
+
+class VMInterpreter(Interpreter):
+    """Interpreter compiling nodes to bytecode and running them in the virtual machine"""
+
+    def visit(self, node: Node, context: Context) -> RTResult[Value]:
+        if isinstance(node, CodeNode):
+            if node.code is None:
+                node.code = Compiler().compile(node.node)
+            return execute(node.code, context)
+        if node is DEFAULT_CONSTRUCTOR_BODY:
+            return execute(DEFAULT_CONSTRUCTOR_CODE, context)
+        # Programs are run once, only the bodies of functions created by another engine are compiled again
+        return execute(Compiler().compile(node), context)
+
+
+# Body shared by every default constructor
+DEFAULT_CONSTRUCTOR_CODE = Compiler().compile(DEFAULT_CONSTRUCTOR_BODY)
@@ -75,7 +75,7 @@ def shell() -> None:
                     if brace_count == 0:
                         break
 
-            result: list[Optional[Value]]
+            result: Optional[Value]
             error: Error | RTError | None
             should_exit: Optional[bool]
             (result, error, should_exit) = base_core.run("<stdin>", text, import_cwd=os.getcwd())  # type: ignore
@@ -83,12 +83,8 @@ def shell() -> None:
             if error:
                 print(error.as_string())
             else:
-                if result:
-                    if len(result) == 1:
-                        # result = result[0]
-                        print(repr(result[0]))
-                    else:
-                        print(repr(result))
+                if result is not None:
+                    print(repr(result))
 
             if should_exit:
                 break
@@ -98,7 +94,8 @@ def shell() -> None:
 
 def usage(program_name: str, stream: IO[str]) -> None:
     print(
-        f"Usage: {program_name} [--source | -s] [--command | -c] [source_file] [--version | -v] [--help | -h]",
+        f"Usage: {program_name} [--source | -s] [--command | -c] [source_file] [--engine name] [--max-depth calls] "
+        "[--stack-size MiB] [--version | -v] [--help | -h]",
         file=stream,
     )
     print(
@@ -106,6 +103,10 @@ def usage(program_name: str, stream: IO[str]) -> None:
 Options and arguments:
     --source | -s    Run a source file
     --command | -c   Run a command
+    --engine name    Select the execution engine (tree, closure, vm), defaults to tree
+    -O0 | -O1        Disable or enable the optimization of programs before execution, defaults to -O1
+    --max-depth n    Fail with a RecursionError when more than n calls are nested, defaults to 1000
+    --stack-size n   Run the program on a thread with a C stack of n MiB, for very deep recursion
     --version | -v   Print the version
     --help | -h      Print this help message
 
@@ -120,6 +121,8 @@ Permission Modes (for testing purposes only):
 Example:
     radon --source source_file.rn
     radon --command 'print("Hello, World!")'
+    radon --engine closure --source source_file.rn
+    radon --max-depth 100000 --stack-size 512 --source source_file.rn
     radon --version
     radon --help
 
@@ -132,6 +135,7 @@ def main(argv: list[str]) -> None:
     program_name = argv.pop(0)
     source_file = None
     command = None
+    stack_size: Optional[int] = None
     while len(argv) > 0:
         arg = argv.pop(0)
         match arg:
@@ -153,6 +157,40 @@ def main(argv: list[str]) -> None:
                     print(f"ERROR: {arg} requires an argument", file=sys.stderr)
                     exit(1)
                 command = argv.pop(0)
+            case "--engine":
+                if len(argv) == 0:
+                    usage(program_name, sys.stderr)
+                    print(f"ERROR: {arg} requires an argument", file=sys.stderr)
+                    exit(1)
+                engine = argv.pop(0)
+                if engine not in base_core.engines.ENGINES:
+                    usage(program_name, sys.stderr)
+                    print(f"ERROR: Unknown engine '{engine}'", file=sys.stderr)
+                    exit(1)
+                base_core.engines.set_engine(engine)
+            case _ if arg.startswith("--engine="):
+                argv.insert(0, arg.removeprefix("--engine="))
+                argv.insert(0, "--engine")
+            case "--max-depth" | "--stack-size":
+                if len(argv) == 0:
+                    usage(program_name, sys.stderr)
+                    print(f"ERROR: {arg} requires an argument", file=sys.stderr)
+                    exit(1)
+                value = argv.pop(0)
+                if not value.isdigit() or int(value) < 1:
+                    usage(program_name, sys.stderr)
+                    print(f"ERROR: {arg} requires a positive number, got '{value}'", file=sys.stderr)
+                    exit(1)
+                if arg == "--max-depth":
+                    base_core.limits.set_max_depth(int(value))
+                else:
+                    stack_size = int(value) * 1024 * 1024
+            case _ if arg.startswith("--max-depth=") or arg.startswith("--stack-size="):
+                name, value = arg.split("=", 1)
+                argv.insert(0, value)
+                argv.insert(0, name)
+            case "-O0" | "-O1":
+                base_core.optimizer.set_optimization_level(int(arg.removeprefix("-O")))
             # These flags starting with --allow should only be used for testing, and not be allowed to be set by a user
             case "--allow-all" | "-A":
                 base_core.security.allow_all_permissions()
@@ -169,6 +207,15 @@ def main(argv: list[str]) -> None:
 
     pos = Position(0, 0, 0, "<argv>", "<argv>")
     base_core.global_symbol_table.set("argv", base_core.radonify(argv, pos, pos, Context("<global>")))
+    if source_file is None and command is None:
+        shell()
+    elif stack_size is not None:
+        base_core.limits.run_with_stack_size(lambda: run(source_file, command), stack_size)
+    else:
+        run(source_file, command)
+
+
+def run(source_file: Optional[str], command: Optional[str]) -> None:
     if source_file is not None:
         head, _ = os.path.split(source_file)
         try:
@@ -195,9 +242,6 @@ def main(argv: list[str]) -> None:
         if error:
             print(error.as_string())
 
-    else:
-        shell()
-
 
 if __name__ == "__main__":
     main(sys.argv)
@@ -7,6 +7,8 @@ import sys
 from difflib import unified_diff  # Rule 34 of Python: If it exists, it's in the standard library
 from typing import IO, NamedTuple
 
+from core.engines import ENGINES
+
 
 class Output(NamedTuple):
     code: int
@@ -25,9 +27,15 @@ class Output(NamedTuple):
             json.dump({"code": self.code, "stdout": self.stdout, "stderr": self.stderr}, f)
 
 
-def run_test(test: str) -> Output:
+# Engines and optimization levels the tests are run with, the output must be the same with all of them
+CONFIGURATIONS = [(engine, "-O1") for engine in ENGINES] + [("tree", "-O0")]
+
+
+def run_test(test: str, engine: str = "tree", optimization: str = "-O0") -> Output:
     proc = subprocess.run(
-        [sys.executable, "radon.py", "-s", test, "-A"], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        [sys.executable, "radon.py", "-s", test, "-A", f"--engine={engine}", optimization],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
     # Normalize path separators in output to forward slashes
     stdout = proc.stdout.decode("utf-8").replace("\r\n", "\n")
@@ -41,10 +49,10 @@ def run_test(test: str) -> Output:
     return Output(proc.returncode, stdout, stderr)
 
 
-def run_tests_rec(test_path: str, failed_tests: list[str]) -> None:
+def run_tests_rec(test_path: str, failed_tests: list[str], engine: str, optimization: str) -> None:
     if os.path.isdir(test_path):
         for test in os.listdir(test_path):
-            run_tests_rec(os.path.join(test_path, test), failed_tests)
+            run_tests_rec(os.path.join(test_path, test), failed_tests, engine, optimization)
     elif os.path.isfile(test_path):
         json_file = f"{test_path}.json"
         if not test_path.endswith(".rn"):
@@ -54,25 +62,27 @@ def run_tests_rec(test_path: str, failed_tests: list[str]) -> None:
             print("NOTE: to create this file, run the `record` subcommand")
             return
 
-        print(f"Running test {test_path!r}...", end="", flush=True)
-        output = run_test(test_path)
+        configuration = f"{engine}, {optimization}"
+        print(f"Running test {test_path!r} ({configuration})...", end="", flush=True)
+        output = run_test(test_path, engine, optimization)
         expected_output = Output.from_file(json_file)
 
         if output != expected_output:
-            print(f"\rTest {test_path!r} failed!" + " " * 20)
+            print(f"\rTest {test_path!r} ({configuration}) failed!" + " " * 20)
             print(f"Expected: {expected_output!r}")
             print(f"Got:      {output!r}")
-            print(f"NOTE: run `{sys.argv[0]} diff {test_path}` for more information")
-            failed_tests.append(test_path)
+            print(f"NOTE: run `{sys.argv[0]} diff {test_path} {engine} {optimization}` for more information")
+            failed_tests.append(f"{test_path} ({configuration})")
         else:
-            print(f"\rTest {test_path!r} passed!" + " " * 20)
+            print(f"\rTest {test_path!r} ({configuration}) passed!" + " " * 20)
     else:
         assert False, "unreachable"
 
 
 def run_tests(test_path: str = "tests") -> int:
     failed_tests: list[str] = []
-    run_tests_rec(test_path, failed_tests)
+    for engine, optimization in CONFIGURATIONS:
+        run_tests_rec(test_path, failed_tests, engine, optimization)
 
     print()
     print("TEST SUMMARY:")
@@ -119,8 +129,8 @@ def usage(program_name: str, stream: IO[str]) -> None:
 SUBCOMMANDS:
     help           - Print this help message to stdout and exit successfully
     run [tests]    - Run tests in directory [tests] (default: "tests/"). Can also be used to run only a single test
-    record [tests] - Record output of tests in directory [tests] (default: "tests/"). Can also be used to record only a single test
-    diff <test.rn> - Show diff between expected and actual output
+    record [tests] - Record output of tests in directory [tests] (default: "tests/"), without optimization. Can also be used to record only a single test
+    diff <test.rn> [engine] [-O0|-O1] - Show diff between expected and actual output (default: "tree" "-O1")
     full           - Same as `{program_name} run` + `make lint`
 """,
         file=stream,
@@ -222,8 +232,13 @@ def main(argv: list[str]) -> int:
                 print("ERROR: no test to diff provided", file=sys.stderr)
                 return 1
             test = argv.pop(0)
+            engine = argv.pop(0) if len(argv) > 0 else "tree"
+            if engine not in ENGINES:
+                print(f"ERROR: unknown engine '{engine}'", file=sys.stderr)
+                return 1
+            optimization = argv.pop(0) if len(argv) > 0 else "-O1"
             try:
-                actual_output = run_test(f"{test}")
+                actual_output = run_test(f"{test}", engine, optimization)
             except FileNotFoundError:
                 print(f"ERROR: test {test!r} not found", file=sys.stderr)
                 return 1